@@ -8,15 +8,25 @@ AIエージェント構築のポイントに基づく設計:
 """
 
 import logging
+import re
 from typing import Any, Dict, List, Optional
 
 from langchain_google_genai import ChatGoogleGenerativeAI
 
 from ..database.data_access import DataAccess
 from ..core.config import settings
+from ..core.llm import get_chat_model
 
 logger = logging.getLogger(__name__)
 
+# "「〇〇」" / "『〇〇』" / "〇〇の(面積|情報|状況)" から圃場名を抽出する
+# 前後の空白はパターン側で読み飛ばす（抽出後の strip() が不要）
+_FIELD_NAME_PATTERNS = (
+    re.compile(r"「(?=[^」])\s*([^」]*?)\s*」"),
+    re.compile(r"『(?=[^』])\s*([^』]*?)\s*』"),
+    re.compile(r"(?=[^の])\s*([^の]*?)\s*の(?:面積|情報|状況)"),
+)
+
 
 class FieldAgent:
     """
@@ -37,13 +47,7 @@ class FieldAgent:
 
     def _setup_llm(self) -> ChatGoogleGenerativeAI:
         """LLMの設定"""
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            google_api_key=self.config.google_ai.api_key,
-            temperature=0.1,
-            max_tokens=2048,
-            timeout=30,
-        )
+        return get_chat_model("gemini-2.0-flash-exp", max_tokens=2048)
 
     def _setup_tools(self) -> List[Any]:
         """ツールの設定 - このエージェントはツールを直接使用せず、DataAccess層を呼び出します"""
@@ -157,14 +161,10 @@ class FieldAgent:
 
     def _extract_field_name(self, query: str) -> Optional[str]:
         """クエリから圃場名を抽出するヘルパー関数"""
-        import re
-
-        # "「〇〇」" or "『〇〇』" or "〇〇の" のパターンで抽出
-        patterns = [r"「([^」]+)」", r"『([^』]+)』", r"([^の]+)の(?:面積|情報|状況)"]
-        for pattern in patterns:
-            match = re.search(pattern, query)
+        for pattern in _FIELD_NAME_PATTERNS:
+            match = pattern.search(query)
             if match:
-                return match.group(1).strip()
+                return match.group(1)
 
         # 簡易的にキーワードで分割
         words = query.split(" ")
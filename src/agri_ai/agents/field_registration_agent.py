@@ -8,6 +8,7 @@ AIエージェント構築のポイントに基づく設計:
 """
 
 import logging
+import re
 from typing import Any, Dict, List, Optional
 
 from langchain.agents import AgentExecutor, create_tool_calling_agent
@@ -16,9 +17,15 @@ from langchain_google_genai import ChatGoogleGenerativeAI
 
 from ..langchain_tools.field_registration_tool import FieldRegistrationTool
 from ..core.config import settings
+from ..core.llm import get_chat_model
 
 logger = logging.getLogger(__name__)
 
+# 登録を示唆するパターン（"を…登録" など）を1つの正規表現にまとめたもの
+_REGISTRATION_PATTERN_RE = re.compile(
+    r"を.*(?:登録|追加|作成)|(?:ha|ヘクタール).*登録|エリアに.*(?:登録|追加)"
+)
+
 
 class FieldRegistrationAgent:
     """
@@ -40,13 +47,7 @@ class FieldRegistrationAgent:
         
     def _setup_llm(self) -> ChatGoogleGenerativeAI:
         """LLMの設定"""
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.0-flash-exp",
-            google_api_key=self.config.google_ai.api_key,
-            temperature=0.1,
-            max_tokens=2048,
-            timeout=30
-        )
+        return get_chat_model("gemini-2.0-flash-exp", max_tokens=2048)
     
     def _setup_tools(self) -> List[Any]:
         """ツールの設定 - 登録専用ツール"""
@@ -190,21 +191,12 @@ class FieldRegistrationAgent:
             "学校前", "新田", "若菜裏"
         ]
         
-        # 登録を示唆するパターンもチェック
-        registration_patterns = [
-            "を.*登録", "を.*追加", "を.*作成",
-            "ha.*登録", "ヘクタール.*登録",
-            "エリアに.*登録", "エリアに.*追加"
-        ]
-        
         # キーワードマッチ
-        keyword_match = any(keyword in query for keyword in registration_keywords)
-        
-        # パターンマッチ
-        import re
-        pattern_match = any(re.search(pattern, query) for pattern in registration_patterns)
+        if any(keyword in query for keyword in registration_keywords):
+            return True
         
-        return keyword_match or pattern_match
+        # 登録を示唆するパターンもチェック（キーワードで判定できなかった場合のみ）
+        return _REGISTRATION_PATTERN_RE.search(query) is not None
     
     def get_capabilities(self) -> Dict[str, Any]:
         """エージェントの能力情報を返す"""
@@ -5,6 +5,7 @@ WorkLogRegistrationAgent: 作業記録登録専門エージェント
 MasterDataResolverと連携してIDベースのデータ正規化を実現する。
 """
 
+import re
 import uuid
 import logging
 from datetime import datetime, timedelta
@@ -14,6 +15,50 @@ from ..dependencies.database import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# 相対日付の抽出パターン（先に一致したものを採用）
+_RELATIVE_DATE_PATTERNS = (
+    (re.compile(r'昨日|きのう'), '昨日'),
+    (re.compile(r'一昨日|おととい'), '一昨日'),
+    (re.compile(r'今日|きょう'), '今日'),
+    (re.compile(r'(\d+)日前'), r'\1日前'),
+)
+_DAYS_AGO_RE = re.compile(r'(\d+)日前')
+
+# 作業種別キーワード（検出結果はこの順序で返す）
+_WORK_TYPE_KEYWORDS = {
+    '防除': ('防除', '農薬', '散布', '殺菌', '殺虫'),
+    '施肥': ('施肥', '肥料', '追肥', '元肥'),
+    '栽培': ('播種', '定植', '摘心', '誘引', '整枝'),
+    '収穫': ('収穫', '収穫量', '出荷'),
+    '管理': ('草刈り', '清掃', '点検'),
+}
+_WORK_TYPE_BY_KEYWORD = {
+    keyword: work_type for work_type, keywords in _WORK_TYPE_KEYWORDS.items() for keyword in keywords
+}
+# 全キーワードを1回の走査で検出する（先読みにより重なり合う出現も拾う）
+_WORK_TYPE_KEYWORD_RE = re.compile(
+    '(?=(' + '|'.join(map(re.escape, sorted(_WORK_TYPE_BY_KEYWORD, key=len, reverse=True))) + '))'
+)
+_WORK_COUNT_RE = re.compile(r'(\d+)回目')
+
+# 圃場名候補
+_FIELD_NAME_PATTERNS = (
+    re.compile(r'([^、。\s]+)(?:ハウス|畑|田|圃場)'),
+    re.compile(r'([^、。\s]+)の(?:防除|施肥|作業)'),
+)
+
+# 作物名候補
+_CROP_NAME_PATTERNS = (
+    re.compile(r'(トマト|キュウリ|ナス|ピーマン|イチゴ)'),  # 主要作物
+    re.compile(r'([^、。\s]+)(?:の防除|に散布|を収穫)'),
+)
+
+# 資材名候補（すべてのパターンの一致を採用）
+_MATERIAL_NAME_PATTERNS = (
+    re.compile(r'(ダコニール\d*|モレスタン|アブラムシ\w*)'),  # 具体的な農薬名
+    re.compile(r'([^、。\s]+)(?:を散布|使用)'),
+)
+
 
 class WorkLogRegistrationAgent:
     """作業記録登録専門エージェント"""
@@ -66,8 +111,6 @@ class WorkLogRegistrationAgent:
     
     async def _extract_work_info(self, message: str) -> Dict[str, str]:
         """自然言語から基本情報を抽出"""
-        import re
-        
         extracted = {
             'raw_field_name': '',
             'raw_crop_name': '',
@@ -79,70 +122,43 @@ class WorkLogRegistrationAgent:
         }
         
         # 相対日付の抽出
-        date_patterns = [
-            (r'昨日|きのう', '昨日'),
-            (r'一昨日|おととい', '一昨日'),
-            (r'今日|きょう', '今日'),
-            (r'(\d+)日前', r'\1日前'),
-        ]
-        
-        for pattern, replacement in date_patterns:
-            if re.search(pattern, message):
-                extracted['relative_date'] = replacement
+        for pattern, replacement in _RELATIVE_DATE_PATTERNS:
+            match = pattern.search(message)
+            if match:
+                extracted['relative_date'] = match.expand(replacement)
                 break
         
         # 作業種別キーワード
-        work_types = {
-            '防除': ['防除', '農薬', '散布', '殺菌', '殺虫'],
-            '施肥': ['施肥', '肥料', '追肥', '元肥'],
-            '栽培': ['播種', '定植', '摘心', '誘引', '整枝'],
-            '収穫': ['収穫', '収穫量', '出荷'],
-            '管理': ['草刈り', '清掃', '点検'],
+        found_work_types = {
+            _WORK_TYPE_BY_KEYWORD[match.group(1)] for match in _WORK_TYPE_KEYWORD_RE.finditer(message)
         }
-        
-        for work_type, keywords in work_types.items():
-            if any(keyword in message for keyword in keywords):
-                extracted['work_type_keywords'].append(work_type)
+        extracted['work_type_keywords'] = [
+            work_type for work_type in _WORK_TYPE_KEYWORDS if work_type in found_work_types
+        ]
         
         # 回数の抽出
-        count_match = re.search(r'(\d+)回目', message)
+        count_match = _WORK_COUNT_RE.search(message)
         if count_match:
             extracted['work_count'] = int(count_match.group(1))
         
         # 簡易的な名詞抽出（改良の余地あり）
         # 圃場名候補
-        field_patterns = [
-            r'([^、。\s]+)(?:ハウス|畑|田|圃場)',
-            r'([^、。\s]+)の(?:防除|施肥|作業)',
-        ]
-        
-        for pattern in field_patterns:
-            match = re.search(pattern, message)
+        for pattern in _FIELD_NAME_PATTERNS:
+            match = pattern.search(message)
             if match:
                 extracted['raw_field_name'] = match.group(1)
                 break
         
         # 作物名候補
-        crop_patterns = [
-            r'(トマト|キュウリ|ナス|ピーマン|イチゴ)',  # 主要作物
-            r'([^、。\s]+)(?:の防除|に散布|を収穫)',
-        ]
-        
-        for pattern in crop_patterns:
-            match = re.search(pattern, message)
+        for pattern in _CROP_NAME_PATTERNS:
+            match = pattern.search(message)
             if match:
                 extracted['raw_crop_name'] = match.group(1)
                 break
         
         # 資材名候補
-        material_patterns = [
-            r'(ダコニール\d*|モレスタン|アブラムシ\w*)',  # 具体的な農薬名
-            r'([^、。\s]+)(?:を散布|使用)',
-        ]
-        
-        for pattern in material_patterns:
-            matches = re.findall(pattern, message)
-            extracted['raw_material_names'].extend(matches)
+        for pattern in _MATERIAL_NAME_PATTERNS:
+            extracted['raw_material_names'].extend(pattern.findall(message))
         
         return extracted
     
@@ -153,6 +169,21 @@ class WorkLogRegistrationAgent:
             'crop_data': None,
             'material_data': [],
         }
+
+        # 照合対象が何も抽出できなかった場合はマスター取得自体を省略する
+        if not (
+            extracted_info['raw_field_name']
+            or extracted_info['raw_crop_name']
+            or extracted_info['raw_material_names']
+        ):
+            return resolved
+
+        # マスターデータを並行して取得しておく（以降の照合はキャッシュを参照する）
+        try:
+            await self.master_resolver.get_all_masters()
+        except Exception as e:
+            # 取得に失敗した場合は各照合処理でのエラー処理に任せる
+            logger.warning("マスターデータの一括取得に失敗しました: %s", e)
         
         # 圃場データ解決
         if extracted_info['raw_field_name']:
@@ -187,8 +218,7 @@ class WorkLogRegistrationAgent:
         elif relative_date == '今日':
             return today
         elif '日前' in relative_date:
-            import re
-            days_match = re.search(r'(\d+)日前', relative_date)
+            days_match = _DAYS_AGO_RE.search(relative_date)
             if days_match:
                 days = int(days_match.group(1))
                 return today - timedelta(days=days)
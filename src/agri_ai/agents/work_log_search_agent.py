@@ -5,37 +5,67 @@ WorkLogSearchAgent: 作業記録検索専門エージェント
 時系列分析、集計統計、異常検出などの高度な分析機能も提供。
 """
 
+import calendar
 import logging
+import re
 from datetime import datetime, timedelta
+from operator import itemgetter
 from typing import Dict, List, Optional
 from ..core.base_agent import BaseAgent
+from ..core.llm import get_chat_model
 from ..services.master_data_resolver import MasterDataResolver
-from ..database.mongodb_client import create_mongodb_client
 from ..database.data_access import DataAccessLayer
 
 logger = logging.getLogger(__name__)
 
+# 圃場名抽出パターン（「第N」形式も「第N」として同じパターンで拾える）
+_FIELD_NAME_RE = re.compile(r"([^、。\s]+)(?:ハウス|畑|田|圃場)")
+
+# 「過去N日 / N週間 / Nヶ月」の期間指定（単位ごとの個別検索を1回の走査にまとめる）
+_PAST_PERIOD_RE = re.compile(r"過去(\d+)(日|週間|ヶ?月)")
+
+# 作物名キーワード（検出結果はこの順序で返す）
+_CROP_KEYWORDS = ("トマト", "キュウリ", "ナス", "ピーマン", "イチゴ")
+_CROP_KEYWORD_RE = re.compile("|".join(map(re.escape, _CROP_KEYWORDS)))
+
+# 作業種別キーワード（検出結果はこの順序で返す）
+_WORK_TYPE_KEYWORDS = {
+    "防除": ("防除", "農薬", "散布"),
+    "施肥": ("施肥", "肥料", "追肥"),
+    "栽培": ("播種", "定植", "摘心"),
+    "収穫": ("収穫", "収穫量"),
+    "管理": ("草刈り", "清掃", "点検"),
+}
+_WORK_TYPE_BY_KEYWORD = {
+    keyword: work_type for work_type, keywords in _WORK_TYPE_KEYWORDS.items() for keyword in keywords
+}
+# 全キーワードを1回の走査で検出する（先読みにより重なり合う出現も拾う）
+_WORK_TYPE_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_WORK_TYPE_BY_KEYWORD, key=len, reverse=True))) + "))"
+)
+
+
+def _months_ago(dt: datetime, months: int) -> datetime:
+    """カレンダー上で months ヶ月前の同日時を返す（存在しない日は月末に丸める）"""
+    year, month_index = divmod(dt.year * 12 + dt.month - 1 - months, 12)
+    month = month_index + 1
+    day = min(dt.day, calendar.monthrange(year, month)[1])
+    return dt.replace(year=year, month=month, day=day)
+
 
 class WorkLogSearchAgent(BaseAgent):
     """作業記録検索専門エージェント"""
 
+    # マスターデータ照合（キャッシュ付き）はプロセス内の全インスタンスで共有する
+    master_resolver = MasterDataResolver()
+
     def __init__(self):
         super().__init__()
-        self.master_resolver = MasterDataResolver()
-        self.data_access = DataAccessLayer(create_mongodb_client())
+        self.data_access = DataAccessLayer.get_instance()
 
     def _setup_llm(self):
         """LLM設定（軽量化）"""
-        from langchain_google_genai import ChatGoogleGenerativeAI
-        from ..core.config import settings
-
-        return ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash",
-            temperature=0.1,
-            google_api_key=settings.google_ai.api_key,
-            max_tokens=1024,
-            timeout=30,
-        )
+        return get_chat_model("gemini-2.5-flash", max_tokens=1024)
 
     def _setup_tools(self) -> List:
         """ツールの設定 - 循環インポートを避けるため空のリストを返す"""
@@ -184,9 +214,6 @@ class WorkLogSearchAgent(BaseAgent):
 
     async def _parse_search_query(self, query: str) -> Dict[str, any]:
         """検索クエリを解析してパラメータを抽出"""
-        import re
-        from datetime import datetime, timedelta
-
         params = {
             "field_names": [],
             "crop_names": [],
@@ -207,58 +234,41 @@ class WorkLogSearchAgent(BaseAgent):
                 "end": yesterday.replace(hour=23, minute=59, second=59),
             }
         elif "先月" in query or "前月" in query:
-            last_month = today.replace(day=1) - timedelta(days=1)
-            start_of_last_month = last_month.replace(day=1)
+            start_of_this_month = today.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
             params["date_range"] = {
-                "start": start_of_last_month,
-                "end": last_month.replace(hour=23, minute=59, second=59),
+                "start": _months_ago(start_of_this_month, 1),
+                "end": start_of_this_month - timedelta(microseconds=1),
             }
         elif "今月" in query or "当月" in query:
             start_of_month = today.replace(day=1, hour=0, minute=0, second=0)
             params["date_range"] = {"start": start_of_month, "end": today}
         elif "過去" in query:
-            days_match = re.search(r"過去(\d+)日", query)
-            weeks_match = re.search(r"過去(\d+)週間", query)
-            months_match = re.search(r"過去(\d+)ヶ?月", query)
-
-            if days_match:
-                days = int(days_match.group(1))
-                params["date_range"] = {"start": today - timedelta(days=days), "end": today}
-            elif weeks_match:
-                weeks = int(weeks_match.group(1))
-                params["date_range"] = {"start": today - timedelta(weeks=weeks), "end": today}
-            elif months_match:
-                months = int(months_match.group(1))
-                params["date_range"] = {"start": today - timedelta(days=months * 30), "end": today}
-
-        # 圃場名の抽出
-        field_patterns = [
-            r"([^、。\s]+)(?:ハウス|畑|田|圃場)",
-            r"第(\d+)(?:ハウス|畑|圃場)",
-        ]
+            # 単位ごとに最初の出現を採用し、日 > 週間 > 月 の順に優先する
+            periods = {}
+            for amount, unit in _PAST_PERIOD_RE.findall(query):
+                periods.setdefault(unit.lstrip("ヶ"), int(amount))
 
-        for pattern in field_patterns:
-            matches = re.findall(pattern, query)
-            params["field_names"].extend(matches)
+            if "日" in periods:
+                params["date_range"] = {"start": today - timedelta(days=periods["日"]), "end": today}
+            elif "週間" in periods:
+                params["date_range"] = {"start": today - timedelta(weeks=periods["週間"]), "end": today}
+            elif "月" in periods:
+                params["date_range"] = {"start": _months_ago(today, periods["月"]), "end": today}
+
+        # 圃場名の抽出（1パスで走査）
+        params["field_names"] = _FIELD_NAME_RE.findall(query)
 
         # 作物名の抽出
-        crop_keywords = ["トマト", "キュウリ", "ナス", "ピーマン", "イチゴ"]
-        for crop in crop_keywords:
-            if crop in query:
-                params["crop_names"].append(crop)
+        found_crops = frozenset(_CROP_KEYWORD_RE.findall(query))
+        params["crop_names"] = [crop for crop in _CROP_KEYWORDS if crop in found_crops]
 
         # 作業種別の抽出
-        work_type_map = {
-            "防除": ["防除", "農薬", "散布"],
-            "施肥": ["施肥", "肥料", "追肥"],
-            "栽培": ["播種", "定植", "摘心"],
-            "収穫": ["収穫", "収穫量"],
-            "管理": ["草刈り", "清掃", "点検"],
+        found_work_types = {
+            _WORK_TYPE_BY_KEYWORD[match.group(1)] for match in _WORK_TYPE_KEYWORD_RE.finditer(query)
         }
-
-        for work_type, keywords in work_type_map.items():
-            if any(keyword in query for keyword in keywords):
-                params["work_categories"].append(work_type)
+        params["work_categories"] = [
+            work_type for work_type in _WORK_TYPE_KEYWORDS if work_type in found_work_types
+        ]
 
         # 件数制限の調整
         if "全て" in query or "すべて" in query:
@@ -360,18 +370,19 @@ class WorkLogSearchAgent(BaseAgent):
             return None
 
         # 時系列で並び替え
-        prevention_records.sort(key=lambda x: x["work_date"])
+        prevention_records.sort(key=itemgetter("work_date"))
 
         # 連続使用のチェック
         consecutive_materials = []
-        prev_materials = None
+        prev_materials = frozenset()
 
         for record in prevention_records:
             materials = record.get("extracted_data", {}).get("material_names", [])
             if materials:
-                if prev_materials and any(m in prev_materials for m in materials):
+                material_set = frozenset(materials)
+                if not prev_materials.isdisjoint(material_set):
                     consecutive_materials.append({"date": record["work_date"], "materials": materials})
-                prev_materials = materials
+                prev_materials = material_set
 
         return {
             "type": "material_rotation",
@@ -422,37 +433,9 @@ class WorkLogSearchAgent(BaseAgent):
                 "recommendations": analyzed_results["recommendations"],
             }
 
-        # 結果のフォーマット
-        formatted_results = []
-        for record in results:
-            formatted_record = {
-                "log_id": record["log_id"],
-                "work_date": record["work_date"].strftime("%Y-%m-%d"),
-                "category": record["category"],
-                "original_message": record["original_message"],
-                "extracted_data": record.get("extracted_data", {}),
-                "created_at": record["created_at"].strftime("%Y-%m-%d %H:%M"),
-            }
-            # Add a human-readable summary
-            summary_parts = []
-            summary_parts.append(f"日付: {formatted_record['work_date']}")
-
-            extracted_data = formatted_record["extracted_data"]
-            field_name = extracted_data.get("field_name")
-            if field_name:
-                summary_parts.append(f"圃場: {field_name}")
-
-            work_content = extracted_data.get("work_content")
-            if work_content:
-                summary_parts.append(f"作業内容: {work_content}")
-            elif formatted_record["category"]:
-                summary_parts.append(f"作業カテゴリ: {formatted_record['category']}")
-
-            if not work_content and not formatted_record["category"]:
-                summary_parts.append(f"メッセージ: {formatted_record['original_message']}")
-
-            formatted_record["summary"] = " ".join(summary_parts)
-            formatted_results.append(formatted_record)
+        # 後段（LLM・LINE）が実際に使う件数だけ整形する
+        format_limit = params.get("format_limit", 30)
+        formatted_results = [self._format_record(record) for record in results[:format_limit]]
 
         return {
             "success": True,
@@ -461,5 +444,37 @@ class WorkLogSearchAgent(BaseAgent):
             "statistics": statistics,
             "patterns": analyzed_results["patterns"],
             "recommendations": analyzed_results["recommendations"],
+            "truncated": len(results) > format_limit,
             "message": f'{analyzed_results["total_count"]}件の作業記録が見つかりました。',
         }
+
+    def _format_record(self, record: Dict) -> Dict[str, any]:
+        """作業記録1件の整形"""
+        formatted_record = {
+            "log_id": record["log_id"],
+            "work_date": record["work_date"].date().isoformat(),
+            "category": record["category"],
+            "original_message": record["original_message"],
+            "extracted_data": record.get("extracted_data", {}),
+            "created_at": record["created_at"].isoformat(sep=" ", timespec="minutes"),
+        }
+        # Add a human-readable summary
+        summary_parts = []
+        summary_parts.append(f"日付: {formatted_record['work_date']}")
+
+        extracted_data = formatted_record["extracted_data"]
+        field_name = extracted_data.get("field_name")
+        if field_name:
+            summary_parts.append(f"圃場: {field_name}")
+
+        work_content = extracted_data.get("work_content")
+        if work_content:
+            summary_parts.append(f"作業内容: {work_content}")
+        elif formatted_record["category"]:
+            summary_parts.append(f"作業カテゴリ: {formatted_record['category']}")
+
+        if not work_content and not formatted_record["category"]:
+            summary_parts.append(f"メッセージ: {formatted_record['original_message']}")
+
+        formatted_record["summary"] = " ".join(summary_parts)
+        return formatted_record
@@ -5,7 +5,7 @@ LangChain の AgentExecutor を使わない簡易バージョン。
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Any
+from typing import List, Any, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,20 +15,31 @@ class BaseAgent(ABC):
     """エージェント共通の基底クラス"""
 
     def __init__(self):
-        # 下位クラスで実装されたメソッドを呼び出して初期化
-        try:
-            self.llm = self._setup_llm()
-        except Exception as e:
-            logger.warning(f"LLMセットアップでエラー: {e}. ダミーを設定します。")
-            self.llm = None
-
-        try:
-            self.tools: List[Any] = self._setup_tools()
-        except Exception as e:
-            logger.warning(f"ツールセットアップでエラー: {e}. 空リストを設定します。")
-            self.tools = []
-
-        # サブクラスで必要に応じてエージェントエグゼキュータを生成してください
+        # LLM・ツールは初回アクセス時に生成する（未使用エージェントの初期化コストを回避）
+        self._llm = None
+        self._tools: Optional[List[Any]] = None
+
+    @property
+    def llm(self):
+        """LLM インスタンス（初回アクセス時に _setup_llm で生成）"""
+        if self._llm is None:
+            self._llm = self._setup_llm()
+        return self._llm
+
+    @llm.setter
+    def llm(self, value):
+        self._llm = value
+
+    @property
+    def tools(self) -> List[Any]:
+        """ツールリスト（初回アクセス時に _setup_tools で生成）"""
+        if self._tools is None:
+            self._tools = self._setup_tools()
+        return self._tools
+
+    @tools.setter
+    def tools(self, value: List[Any]):
+        self._tools = value
 
     # ----- サブクラスが実装すべきメソッド -----------------
     @abstractmethod
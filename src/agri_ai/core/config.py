@@ -2,134 +2,162 @@
 環境設定と設定値の管理
 """
 
+import logging
+import logging.config
 import os
-from typing import Optional
-from pydantic import BaseModel
-from pydantic_settings import BaseSettings
+from functools import cache, cached_property, lru_cache
+from typing import Any, Optional
+from pydantic import Field, field_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
 
-class GoogleAISettings(BaseModel):
+def _parse_flag(value: Any) -> bool:
+    """環境変数のフラグを解釈する（大文字小文字を問わず "true" のみ真、空文字などは偽）"""
+    return str(value).lower() == "true"
+
+
+@cache
+def _load_env_once() -> None:
+    """.env の読み込み（プロセス内で1度だけ）"""
+    load_dotenv()
+
+
+@cache
+def _ensure_env_file() -> None:
+    """環境設定ファイルの検証（プロセス内で1度だけ）"""
+    env_file = ".env"
+    if not os.path.exists(env_file):
+        raise FileNotFoundError(
+            f"環境設定ファイル '{env_file}' が見つかりません。"
+            f"'.env.example' を '{env_file}' にコピーして適切な値を設定してください。"
+        )
+
+
+class GoogleAISettings(BaseSettings):
     """Google AI API設定"""
 
-    api_key: str = ""
-    model_name: str = "gemini-2.5-flash"
-    temperature: float = 0.1
-    timeout: int = 30
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
+
+    api_key: str = Field("", validation_alias="GOOGLE_API_KEY")
+    model_name: str = Field("gemini-2.5-flash", validation_alias="GOOGLE_AI_MODEL")
+    temperature: float = Field(0.1, validation_alias="GOOGLE_AI_TEMPERATURE")
+    timeout: int = Field(30, validation_alias="AI_RESPONSE_TIMEOUT")
 
 
-class LangSmithSettings(BaseModel):
+class LangSmithSettings(BaseSettings):
     """LangSmith設定"""
 
-    api_key: str = ""
-    project_name: str = "agri-ai-project"
-    endpoint: str = "https://api.smith.langchain.com"
-    tracing_enabled: bool = False
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
+    api_key: str = Field("", validation_alias="LANGSMITH_API_KEY")
+    project_name: str = Field("agri-ai-project", validation_alias="LANGSMITH_PROJECT")
+    endpoint: str = Field("https://api.smith.langchain.com", validation_alias="LANGSMITH_ENDPOINT")
+    tracing_enabled: bool = Field(False, validation_alias="LANGSMITH_TRACING")
 
-class MongoDBSettings(BaseModel):
+    @field_validator("tracing_enabled", mode="before")
+    @classmethod
+    def _parse_tracing_enabled(cls, value: Any) -> bool:
+        return _parse_flag(value)
+
+
+class MongoDBSettings(BaseSettings):
     """MongoDB設定"""
 
-    connection_string: str = ""
-    database_name: str = "agri_ai"
-    max_pool_size: int = 50
-    min_pool_size: int = 5
-    connect_timeout: int = 10000
-    server_selection_timeout: int = 5000
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
+    connection_string: str = Field("", validation_alias="MONGODB_CONNECTION_STRING")
+    database_name: str = Field("agri_ai", validation_alias="MONGODB_DATABASE_NAME")
+    max_pool_size: int = Field(50, validation_alias="MONGODB_MAX_POOL_SIZE")
+    min_pool_size: int = Field(5, validation_alias="MONGODB_MIN_POOL_SIZE")
+    connect_timeout: int = Field(10000, validation_alias="MONGODB_CONNECT_TIMEOUT")
+    server_selection_timeout: int = Field(5000, validation_alias="MONGODB_SERVER_SELECTION_TIMEOUT")
+    max_idle_time: int = Field(30000, validation_alias="MONGODB_MAX_IDLE_TIME")
 
-class LINEBotSettings(BaseModel):
+
+class LINEBotSettings(BaseSettings):
     """LINE Bot設定"""
 
-    channel_access_token: str = ""
-    channel_secret: str = ""
-    webhook_url: Optional[str] = None
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
+
+    channel_access_token: str = Field("", validation_alias="LINE_CHANNEL_ACCESS_TOKEN")
+    channel_secret: str = Field("", validation_alias="LINE_CHANNEL_SECRET")
+    webhook_url: Optional[str] = Field(None, validation_alias="LINE_WEBHOOK_URL")
 
 
-class GoogleCloudSettings(BaseModel):
+class GoogleCloudSettings(BaseSettings):
     """Google Cloud設定"""
 
-    project_id: Optional[str] = None
-    credentials_path: Optional[str] = None
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
+    project_id: Optional[str] = Field(None, validation_alias="GOOGLE_CLOUD_PROJECT")
+    credentials_path: Optional[str] = Field(None, validation_alias="GOOGLE_APPLICATION_CREDENTIALS")
 
-class AppSettings(BaseModel):
+
+class AppSettings(BaseSettings):
     """アプリケーション設定"""
 
-    environment: str = "development"
-    debug: bool = True
-    max_concurrent_requests: int = 100
-    log_level: str = "INFO"
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
+
+    environment: str = Field("development", validation_alias="ENVIRONMENT")
+    debug: bool = Field(True, validation_alias="DEBUG")
+    max_concurrent_requests: int = Field(100, validation_alias="MAX_CONCURRENT_REQUESTS")
+    log_level: str = Field("INFO", validation_alias="LOG_LEVEL")
+
+    @field_validator("debug", mode="before")
+    @classmethod
+    def _parse_debug(cls, value: Any) -> bool:
+        return _parse_flag(value)
 
 
 class Settings(BaseSettings):
     """統合設定クラス"""
 
-    model_config = {"env_file": ".env", "case_sensitive": False, "extra": "allow"}
+    model_config = SettingsConfigDict(case_sensitive=False, extra="ignore")
 
-    def __init__(self, **kwargs):
-        # 環境変数ファイルを読み込み
-        load_dotenv()
-        super().__init__(**kwargs)
-        self._validate_env_file()
+    # 各設定グループは初回アクセス時に環境変数から読み込む
+    @cached_property
+    def google_ai(self) -> GoogleAISettings:
+        return GoogleAISettings()
 
-        # 各設定グループを初期化（環境変数から読み込み）
-        self.google_ai = GoogleAISettings(
-            api_key=os.environ.get("GOOGLE_API_KEY", ""),
-            model_name=os.environ.get("GOOGLE_AI_MODEL", "gemini-2.5-flash"),
-            temperature=float(os.environ.get("GOOGLE_AI_TEMPERATURE", "0.1")),
-            timeout=int(os.environ.get("AI_RESPONSE_TIMEOUT", "30")),
-        )
-        self.langsmith = LangSmithSettings(
-            api_key=os.environ.get("LANGSMITH_API_KEY", ""),
-            project_name=os.environ.get("LANGSMITH_PROJECT", "agri-ai-project"),
-            endpoint=os.environ.get("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com"),
-            tracing_enabled=os.environ.get("LANGSMITH_TRACING", "false").lower() == "true",
-        )
-        self.mongodb = MongoDBSettings(
-            connection_string=os.environ.get("MONGODB_CONNECTION_STRING", ""),
-            database_name=os.environ.get("MONGODB_DATABASE_NAME", "agri_ai"),
-            max_pool_size=int(os.environ.get("MONGODB_MAX_POOL_SIZE", "50")),
-            min_pool_size=int(os.environ.get("MONGODB_MIN_POOL_SIZE", "5")),
-            connect_timeout=int(os.environ.get("MONGODB_CONNECT_TIMEOUT", "10000")),
-            server_selection_timeout=int(os.environ.get("MONGODB_SERVER_SELECTION_TIMEOUT", "5000")),
-        )
-        self.line_bot = LINEBotSettings(
-            channel_access_token=os.environ.get("LINE_CHANNEL_ACCESS_TOKEN", ""),
-            channel_secret=os.environ.get("LINE_CHANNEL_SECRET", ""),
-            webhook_url=os.environ.get("LINE_WEBHOOK_URL"),
-        )
-        self.google_cloud = GoogleCloudSettings(
-            project_id=os.environ.get("GOOGLE_CLOUD_PROJECT"),
-            credentials_path=os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"),
-        )
-        self.app = AppSettings(
-            environment=os.environ.get("ENVIRONMENT", "development"),
-            debug=os.environ.get("DEBUG", "true").lower() == "true",
-            max_concurrent_requests=int(os.environ.get("MAX_CONCURRENT_REQUESTS", "100")),
-            log_level=os.environ.get("LOG_LEVEL", "INFO"),
-        )
+    @cached_property
+    def langsmith(self) -> LangSmithSettings:
+        return LangSmithSettings()
+
+    @cached_property
+    def mongodb(self) -> MongoDBSettings:
+        return MongoDBSettings()
 
-    def _validate_env_file(self):
-        """環境設定ファイルの検証"""
-        env_file = ".env"
-        if not os.path.exists(env_file):
-            raise FileNotFoundError(
-                f"環境設定ファイル '{env_file}' が見つかりません。"
-                f"'.env.example' を '{env_file}' にコピーして適切な値を設定してください。"
-            )
+    @cached_property
+    def line_bot(self) -> LINEBotSettings:
+        return LINEBotSettings()
 
+    @cached_property
+    def google_cloud(self) -> GoogleCloudSettings:
+        return GoogleCloudSettings()
 
+    @cached_property
+    def app(self) -> AppSettings:
+        return AppSettings()
 
-# グローバル設定インスタンス
-settings = Settings()
+    def model_post_init(self, __context: Any) -> None:
+        # 各設定グループの生成前に環境変数ファイルを読み込む
+        _load_env_once()
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """設定インスタンスの取得（プロセス内で1度だけ生成）"""
+    _ensure_env_file()
+    return Settings()
+
+
+# グローバル設定インスタンス（後方互換性のため）
+settings = get_settings()
 
 
 def setup_logging():
     """アプリケーション全体のロギング設定"""
-    import logging
-    import logging.config
-
     log_level = settings.app.log_level.upper()
 
     logging_config = {
@@ -159,5 +187,3 @@ def setup_logging():
     }
 
     logging.config.dictConfig(logging_config)
-
-    logging.config.dictConfig(logging_config)
@@ -14,10 +14,8 @@ class ErrorHandler:
     @staticmethod
     def handle_tool_error(error: Exception, tool_name: str, operation: str = "") -> Dict[str, Any]:
         """ツールエラーの統一処理"""
-        error_message = f"{tool_name}"
-        if operation:
-            error_message += f"の{operation}"
-        error_message += f"でエラーが発生しました: {str(error)}"
+        op = f"の{operation}" if operation else ""
+        error_message = f"{tool_name}{op}でエラーが発生しました: {error}"
         
         logger.error(error_message)
         return {
@@ -0,0 +1,56 @@
+"""
+同期コードから非同期処理を実行するための常駐イベントループ
+
+asyncio.run() は呼び出しごとにイベントループを作り直すため、
+MongoDB（motor）の接続プールが毎回破棄されてしまう。
+同期エントリーポイントからはこのバックグラウンドループにコルーチンを投入する。
+
+motor のクライアントは最初に使われたイベントループに束縛されるため、
+このループ上では専用のクライアント（database.mongodb_client.get_mongodb_client）を使う。
+"""
+
+import asyncio
+import threading
+from typing import Any, Awaitable, Optional
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+
+def get_background_loop() -> asyncio.AbstractEventLoop:
+    """常駐イベントループの取得（初回呼び出し時にスレッドを起動）"""
+    global _loop
+    if _loop is None:
+        with _loop_lock:
+            if _loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="agri-ai-event-loop", daemon=True).start()
+                _loop = loop
+    return _loop
+
+
+def is_background_loop() -> bool:
+    """現在実行中のイベントループが常駐イベントループかどうか"""
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return running is _loop
+
+
+def run_coroutine_sync(coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+    """コルーチンを常駐イベントループで実行し、結果を同期的に返す
+
+    タイムアウトした場合はコルーチンをキャンセルしてから TimeoutError を送出する。
+    常駐イベントループ上から呼び出すと自身の完了を待ってデッドロックするため RuntimeError とする。
+    """
+    if is_background_loop():
+        coro.close()
+        raise RuntimeError("常駐イベントループ上から run_coroutine_sync は呼び出せません（await を使用してください）")
+
+    future = asyncio.run_coroutine_threadsafe(coro, get_background_loop())
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        future.cancel()
+        raise
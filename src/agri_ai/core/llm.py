@@ -0,0 +1,24 @@
+"""
+LLMクライアントの共有
+
+ChatGoogleGenerativeAI はエージェントごとに生成すると HTTP クライアントや
+設定の初期化が毎回発生するため、同一設定のインスタンスをプロセス内で共有する。
+"""
+
+from functools import lru_cache
+
+from .config import get_settings
+
+
+@lru_cache(maxsize=None)
+def get_chat_model(model: str, max_tokens: int, temperature: float = 0.1, timeout: int = 30):
+    """同一設定の ChatGoogleGenerativeAI インスタンスを取得（初回のみ生成）"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+
+    return ChatGoogleGenerativeAI(
+        model=model,
+        temperature=temperature,
+        google_api_key=get_settings().google_ai.api_key,
+        max_tokens=max_tokens,
+        timeout=timeout,
+    )
@@ -7,19 +7,57 @@ AIエージェント構築のポイントに基づく設計:
 - 専門エージェント連携: FieldAgentなどの専門家を管理
 """
 
+import asyncio
 import os
+import threading
+from functools import lru_cache
+from typing import Final, Optional
 
-from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_google_genai import ChatGoogleGenerativeAI
 import logging
 
-from .config import settings
-from ..database.mongodb_client import mongodb_client
+from .config import get_settings
+from .event_loop import run_coroutine_sync
+from .llm import get_chat_model
+from ..database.mongodb_client import get_mongodb_client
 from ..services.query_analyzer import QueryAnalyzer
 
 logger = logging.getLogger(__name__)
 
+__all__ = ["MasterAgent", "get_master_agent"]
+
+# KV-Cache最適化: 呼び出しごとに同一のプレフィックスとなる固定システムプロンプト
+_SYSTEM_PROMPT: Final[str] = """
+あなたは農業管理を支援するAIエージェントの司令塔「MasterAgent」です。
+あなたの主な役割は、ユーザーからの問い合わせを分析し、それを適切な専門エージェントに振り分けることです。
+
+利用可能なツール：
+1. `field_agent_tool`: 圃場（畑やハウス）に関する情報の照会を担当します。「〇〇ハウスの状況は？」「A畑の面積を教えて」といった問い合わせに使用します。
+2. `work_log_registration_agent_tool`: 日々の作業報告を記録・保存します。「昨日トマトに薬を撒いた」「今日の収穫量は30kgだった」といった作業記録の登録に使用します。
+3. `work_log_search`: 過去の作業記録を検索し、ユーザーの質問に答えます。「先週の作業記録を教えて」「トマトの防除履歴は？」といった問い合わせに使用します。
+
+あなたの行動フロー:
+1. ユーザーの要求を分析します。
+2. 最も適した専門エージェントを選択します。
+3. 専門エージェントにタスクを依頼します。
+4. 専門エージェントからの報告を元に、最終的な回答を生成してユーザーに伝えます。
+
+あなたは直接的なデータベース検索や情報提供を行いません。必ず専門エージェントを通じてタスクを実行してください。
+"""
+
+
+@lru_cache(maxsize=1)
+def _get_prompt_template():
+    """固定プロンプトテンプレートの取得（初回のみ生成）"""
+    from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", _SYSTEM_PROMPT),
+            ("human", "{input}"),
+            MessagesPlaceholder(variable_name="agent_scratchpad"),
+        ]
+    )
+
 
 class MasterAgent:
     """
@@ -32,48 +70,60 @@ class MasterAgent:
     - 統合的な結果の提供
     """
 
+    __slots__ = (
+        "llm",
+        "agent_executor",
+        "tools",
+        "field_agent",
+        "work_log_registration_agent",
+        "work_log_search_agent",
+        "execution_plan",
+        "query_analyzer",
+        "_connect_task",
+    )
+
     def __init__(self):
         self.llm = None
         self.agent_executor = None
-        self.tools = []
+        self.tools = ()
         self.field_agent = None  # 圃場専門エージェント
+        self.work_log_registration_agent = None  # 作業記録登録専門エージェント
+        self.work_log_search_agent = None  # 作業記録検索専門エージェント
         self.execution_plan = None  # 実行プラン
         self.query_analyzer = QueryAnalyzer()  # クエリ分析サービス
+        self._connect_task = None  # initialize() でスケジュールしたMongoDB接続タスク
         
         # 初期化を実行
         self.initialize()
 
     def initialize(self):
         """エージェントの初期化"""
+        settings = get_settings()
+
         # LangSmith トレーシングの設定
-        if settings.langsmith.tracing_enabled:
+        ls = settings.langsmith
+        if ls.tracing_enabled:
             os.environ["LANGCHAIN_TRACING_V2"] = "true"
-            os.environ["LANGCHAIN_API_KEY"] = settings.langsmith.api_key
-            os.environ["LANGCHAIN_PROJECT"] = settings.langsmith.project_name
-            os.environ["LANGCHAIN_ENDPOINT"] = settings.langsmith.endpoint
-            logger.info(
-                f"LangSmith トレーシングが有効になりました。プロジェクト: {settings.langsmith.project_name}"
-            )
+            os.environ["LANGCHAIN_API_KEY"] = ls.api_key
+            os.environ["LANGCHAIN_PROJECT"] = ls.project_name
+            os.environ["LANGCHAIN_ENDPOINT"] = ls.endpoint
+            logger.info("LangSmith トレーシングが有効になりました。プロジェクト: %s", ls.project_name)
 
         # データベース接続
-        # MongoDB接続は非同期処理で実行
-        import asyncio
-
-        if not mongodb_client.is_connected:
-            try:
-                # 既存のイベントループを確認
-                try:
-                    loop = asyncio.get_running_loop()
-                    # 既にイベントループが実行中の場合はタスクとしてスケジュール
-                    task = loop.create_task(mongodb_client.connect())
-                    # メッセージ処理前に接続完了を待つ
-                    logger.info("MongoDB接続タスクをスケジュールしました")
-                except RuntimeError:
-                    # イベントループが実行されていない場合は同期実行
-                    asyncio.run(mongodb_client.connect())
-            except Exception as e:
-                logger.error(f"MongoDB接続エラー: {e}")
-                raise
+        # イベントループ実行中であればタスクとしてスケジュールし、process_message_async で完了を待つ。
+        # 実行中のループがない場合は、メッセージ処理時に呼び出し側のループで接続する
+        # （motor のクライアントは最初に使われたループに束縛されるため、ここでは接続しない）
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if loop is not None and not get_mongodb_client().is_connected:
+            self._connect_task = loop.create_task(self._connect_database())
+            logger.info("MongoDB接続タスクをスケジュールしました")
+
+        # エージェント構築済みの場合は再構築しない（接続確認のみ行う）
+        if self.agent_executor is not None:
+            return
 
         # 専門エージェントの初期化
         self._initialize_specialized_agents()
@@ -82,14 +132,32 @@ class MasterAgent:
         self._initialize_tools()
 
         # LLMの初期化
-        self.llm = ChatGoogleGenerativeAI(
-            model="gemini-2.5-flash", temperature=0.1, google_api_key=settings.google_ai.api_key
-        )
+        self.llm = get_chat_model("gemini-2.5-flash", max_tokens=1024)
 
         # エージェントの作成
         self._initialize_agent()
         logger.info("農業AIエージェントの初期化が完了しました")
 
+    async def _connect_database(self):
+        """MongoDB接続とインデックスのウォームアップ（実行中のループ用のクライアントを使用）"""
+        client = get_mongodb_client()
+        await client.connect()
+        try:
+            await client.ensure_indexes()
+        except Exception as e:
+            # インデックス準備の失敗は検索性能にのみ影響するため起動は継続する
+            logger.warning("インデックスのウォームアップに失敗しました: %s", e)
+
+    async def _ensure_database(self):
+        """initialize() でスケジュールした接続の完了を待ち、未接続であれば接続する"""
+        if get_mongodb_client().is_connected:
+            return
+        # 同時に届いたメッセージは実行中の接続タスクを共有する（接続の張り直しを防ぐ）
+        connect_task = self._connect_task
+        if connect_task is None or connect_task.done() or connect_task.get_loop() is not asyncio.get_running_loop():
+            connect_task = self._connect_task = asyncio.ensure_future(self._connect_database())
+        await connect_task
+
     def _initialize_specialized_agents(self):
         """専門エージェントの初期化"""
         from ..agents.field_agent import FieldAgent
@@ -107,23 +175,17 @@ class MasterAgent:
         from ..langchain_tools.work_log_registration_agent_tool import WorkLogRegistrationAgentTool
         from ..langchain_tools.work_log_search_agent_tool import WorkLogSearchAgentTool
 
-        self.tools = [
+        self.tools = (
             FieldAgentTool(self.field_agent),  # 圃場情報専門エージェント
             WorkLogRegistrationAgentTool(),  # 作業記録登録専門エージェント
             WorkLogSearchAgentTool(),  # 作業記録検索専門エージェント
-        ]
+        )
 
     def _initialize_agent(self):
         """エージェントの作成とエグゼキュータの初期化"""
-        prompt = ChatPromptTemplate.from_messages(
-            [
-                ("system", self._get_system_prompt()),
-                ("human", "{input}"),
-                MessagesPlaceholder(variable_name="agent_scratchpad"),
-            ]
-        )
+        from langchain.agents import AgentExecutor, create_openai_tools_agent
 
-        agent = create_openai_tools_agent(self.llm, self.tools, prompt)
+        agent = create_openai_tools_agent(self.llm, self.tools, _get_prompt_template())
 
         self.agent_executor = AgentExecutor(
             agent=agent, tools=self.tools, verbose=True, handle_parsing_errors=True, max_iterations=5
@@ -131,23 +193,7 @@ class MasterAgent:
 
     def _get_system_prompt(self) -> str:
         """システムプロンプトの取得"""
-        return """
-あなたは農業管理を支援するAIエージェントの司令塔「MasterAgent」です。
-あなたの主な役割は、ユーザーからの問い合わせを分析し、それを適切な専門エージェントに振り分けることです。
-
-利用可能なツール：
-1. `field_agent_tool`: 圃場（畑やハウス）に関する情報の照会を担当します。「〇〇ハウスの状況は？」「A畑の面積を教えて」といった問い合わせに使用します。
-2. `work_log_registration_agent_tool`: 日々の作業報告を記録・保存します。「昨日トマトに薬を撒いた」「今日の収穫量は30kgだった」といった作業記録の登録に使用します。
-3. `work_log_search`: 過去の作業記録を検索し、ユーザーの質問に答えます。「先週の作業記録を教えて」「トマトの防除履歴は？」といった問い合わせに使用します。
-
-あなたの行動フロー:
-1. ユーザーの要求を分析します。
-2. 最も適した専門エージェントを選択します。
-3. 専門エージェントにタスクを依頼します。
-4. 専門エージェントからの報告を元に、最終的な回答を生成してユーザーに伝えます。
-
-あなたは直接的なデータベース検索や情報提供を行いません。必ず専門エージェントを通じてタスクを実行してください。
-"""
+        return _SYSTEM_PROMPT
 
     async def process_message_async(self, message: str, user_id: str) -> dict:
         """
@@ -160,7 +206,8 @@ class MasterAgent:
                 'agent_used': str     # 使用したエージェント
             }
         """
-        if not self.agent_executor:
+        agent_executor = self.agent_executor
+        if not agent_executor:
             logger.error("エージェントが初期化されていません。")
             return {
                 "response": "申し訳ございません。システムの準備ができていません。少し待ってから再度お試しください。",
@@ -168,25 +215,23 @@ class MasterAgent:
                 "error": True,
             }
 
-        # MongoDB接続確認
-        if not mongodb_client.is_connected:
-            try:
-                await mongodb_client.connect()
-            except Exception as e:
-                logger.error(f"MongoDB接続エラー: {e}")
-                return {
-                    "response": "データベース接続エラーが発生しました。しばらくしてから再度お試しください。",
-                    "agent_used": "master_agent",
-                    "error": True,
-                }
-
+        # 通常は起動時（lifespan / initialize）に確立済み。未完了の場合はここで待つ
         try:
-            # 1. クエリ分析と実行プランの作成
-            analysis_result = await self.query_analyzer.analyze_query_intent(message)
-            plan = await self.query_analyzer.create_execution_plan(analysis_result)
+            await self._ensure_database()
+        except Exception as e:
+            logger.error("MongoDB接続が確立されていません: %s", e)
+            return {
+                "response": "データベース接続エラーが発生しました。しばらくしてから再度お試しください。",
+                "agent_used": "master_agent",
+                "error": True,
+            }
 
-            # 2. エージェント実行
-            response = self.agent_executor.invoke({"input": message, "user_id": user_id})
+        try:
+            # クエリ分析・実行プラン作成とエージェント実行を並行して行う
+            response, (_, plan) = await asyncio.gather(
+                agent_executor.ainvoke({"input": message, "user_id": user_id}),
+                self.query_analyzer.analyze_and_plan(message),
+            )
 
             if isinstance(response, dict) and "output" in response:
                 final_response = response["output"]
@@ -196,7 +241,7 @@ class MasterAgent:
             return {"response": final_response, "plan": plan, "agent_used": "master_agent"}
 
         except Exception as e:
-            logger.error(f"メッセージ処理エラー: {e}")
+            logger.error("メッセージ処理エラー: %s", e)
             return {
                 "response": "申し訳ございません。処理中にエラーが発生しました。しばらくしてから再度お試しください。",
                 "agent_used": "master_agent",
@@ -205,18 +250,26 @@ class MasterAgent:
 
     def process_message(self, message: str, user_id: str) -> str:
         """同期ラッパー関数（後方互換性のため）"""
-        import asyncio
-
         try:
             loop = asyncio.get_running_loop()
             # 既にイベントループが実行中の場合は同期実行できない
             logger.warning("イベントループ実行中のため、同期実行はできません")
             return "システムが処理中です。しばらくお待ちください。"
         except RuntimeError:
-            # イベントループが実行されていない場合は非同期実行結果を取得
-            result = asyncio.run(self.process_message_async(message, user_id))
+            # イベントループが実行されていない場合は常駐ループで実行結果を取得
+            result = run_coroutine_sync(self.process_message_async(message, user_id))
             return result.get("response", "エラーが発生しました")
 
 
-# グローバルエージェントインスタンス
-master_agent = MasterAgent()
+_master_agent: Optional[MasterAgent] = None
+_master_agent_lock = threading.Lock()
+
+
+def get_master_agent() -> MasterAgent:
+    """MasterAgentのシングルトン取得（初回呼び出し時に生成）"""
+    global _master_agent
+    if _master_agent is None:
+        with _master_agent_lock:
+            if _master_agent is None:
+                _master_agent = MasterAgent()
+    return _master_agent
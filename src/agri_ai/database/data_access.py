@@ -4,18 +4,105 @@
 """
 
 import logging
-from typing import Dict, Any, List
+import re
+import time
+from typing import Dict, Any, List, Optional
 from bson import ObjectId
-from .mongodb_client import MongoDBClient
+from .mongodb_client import MongoDBClient, get_mongodb_client
 
 logger = logging.getLogger(__name__)
 
+# 作物・資材マスターの取得結果キャッシュ（マスターは人手でしか更新されないためプロセス内で共有）
+_MASTER_CACHE_TTL = 600  # 10分キャッシュ
+_MASTER_CACHE_MAXSIZE = 1024
+_crop_cache: Dict[ObjectId, tuple] = {}
+_material_cache: Dict[ObjectId, tuple] = {}
+
+
+def _get_cached(cache: Dict[ObjectId, tuple], key: ObjectId) -> Optional[Dict[str, Any]]:
+    """マスターキャッシュの取得（期限切れは None）"""
+    entry = cache.get(key)
+    if entry is None:
+        return None
+    cached_time, document = entry
+    if time.time() - cached_time >= _MASTER_CACHE_TTL:
+        cache.pop(key, None)
+        return None
+    return dict(document)
+
+
+def _store_cached(cache: Dict[ObjectId, tuple], key: ObjectId, document: Dict[str, Any]) -> None:
+    """マスターキャッシュへ保存（上限超過時は古いものから破棄）"""
+    if len(cache) >= _MASTER_CACHE_MAXSIZE:
+        cache.pop(next(iter(cache)))
+    cache[key] = (time.time(), dict(document))
+
+
+# カーソル1往復あたりの最大取得件数
+_CURSOR_BATCH_SIZE = 200
+
+# 各検索で呼び出し側が実際に参照するフィールドのみ取得する
+_WORK_LOG_PROJECTION = {
+    "log_id": 1,
+    "work_date": 1,
+    "category": 1,
+    "original_message": 1,
+    "extracted_data": 1,
+    "created_at": 1,
+}
+_FIELD_PROJECTION = {
+    "name": 1,
+    "field_name": 1,
+    "area": 1,
+    "soil_type": 1,
+    "plantings": 1,
+    "current_cultivation": 1,
+    "next_scheduled_work": 1,
+}
+
+
+def invalidate_master_cache(crop_id: Optional[ObjectId] = None, material_id: Optional[ObjectId] = None) -> None:
+    """作物・資材マスター更新時にキャッシュを破棄する（ID省略時は全件）"""
+    if crop_id is None and material_id is None:
+        _crop_cache.clear()
+        _material_cache.clear()
+        return
+    if crop_id is not None:
+        _crop_cache.pop(crop_id, None)
+    if material_id is not None:
+        _material_cache.pop(material_id, None)
+
 
 class DataAccessLayer:
     """データアクセス共通レイヤー"""
 
-    def __init__(self, mongodb_client: MongoDBClient):
-        self.mongodb_client = mongodb_client
+    _instance: Optional["DataAccessLayer"] = None
+
+    def __init__(self, mongodb_client: Optional[MongoDBClient] = None):
+        self._mongodb_client = mongodb_client
+
+    @property
+    def mongodb_client(self) -> MongoDBClient:
+        """使用するMongoDBクライアント（未指定時は実行中のイベントループに対応する共有クライアント）"""
+        if self._mongodb_client is not None:
+            return self._mongodb_client
+        return get_mongodb_client()
+
+    @mongodb_client.setter
+    def mongodb_client(self, client: Optional[MongoDBClient]) -> None:
+        self._mongodb_client = client
+
+    @classmethod
+    def get_instance(cls) -> "DataAccessLayer":
+        """共有MongoDBクライアント（接続プール）を使うインスタンスを取得
+
+        インスタンス自体はイベントループに束縛される状態を持たず、クライアントは
+        呼び出しごとに実行中のイベントループに対応するもの（get_mongodb_client）を使うため、
+        ループごとに分けずプロセス内で1つを共有する。
+        """
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
 
     async def _get_collection(self, collection_name: str):
         """コレクション取得の共通メソッド"""
@@ -23,60 +110,105 @@ class DataAccessLayer:
 
     async def get_field_info(self, field_id: ObjectId) -> Dict[str, Any]:
         """圃場情報取得の共通メソッド"""
+        fields = await self.get_fields_with_crops({"_id": field_id})
+        return fields[0] if fields else {}
+
+    async def get_fields_with_crops(self, field_filter: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """圃場情報を現在の作物名付きで一括取得（作物は $lookup で1往復にまとめる）"""
         try:
             fields_collection = await self._get_collection("fields")
-            field_info = await fields_collection.find_one({"_id": field_id})
-
-            if not field_info:
-                return {}
-
-            # 現在の栽培情報を取得
-            if field_info.get("current_cultivation"):
-                crop_info = await self.get_crop_info(field_info["current_cultivation"]["crop_id"])
-                field_info["current_cultivation"]["crop_name"] = crop_info.get("name", "不明")
-
-            return field_info
+            pipeline = [
+                {"$match": field_filter},
+                {
+                    "$lookup": {
+                        "from": "crops",
+                        "localField": "current_cultivation.crop_id",
+                        "foreignField": "_id",
+                        "as": "_crop",
+                    }
+                },
+                {
+                    "$addFields": {
+                        "current_cultivation": {
+                            "$cond": [
+                                {"$ifNull": ["$current_cultivation", False]},
+                                {
+                                    "$mergeObjects": [
+                                        "$current_cultivation",
+                                        {"crop_name": {"$ifNull": [{"$arrayElemAt": ["$_crop.name", 0]}, "不明"]}},
+                                    ]
+                                },
+                                "$current_cultivation",
+                            ]
+                        }
+                    }
+                },
+                {"$project": {"_crop": 0}},
+            ]
+            return await fields_collection.aggregate(pipeline).to_list(None)
 
         except Exception as e:
-            logger.error(f"圃場情報取得エラー: {e}")
-            return {}
+            logger.error("圃場情報取得エラー: %s", e)
+            return []
 
     async def get_field_ids_by_name(self, field_filter: Dict[str, Any]) -> List[ObjectId]:
         """圃場ID取得の共通メソッド"""
         try:
             fields_collection = await self._get_collection("fields")
-            fields = await fields_collection.find(field_filter).to_list(None)
-            return [field["_id"] for field in fields]
+            cursor = fields_collection.find(field_filter, {"_id": 1}).batch_size(_CURSOR_BATCH_SIZE)
+            return [field["_id"] async for field in cursor]
 
         except Exception as e:
-            logger.error(f"圃場ID取得エラー: {e}")
+            logger.error("圃場ID取得エラー: %s", e)
             return []
 
     async def get_crop_info(self, crop_id: ObjectId) -> Dict[str, Any]:
         """作物情報取得の共通メソッド"""
+        cached = _get_cached(_crop_cache, crop_id)
+        if cached is not None:
+            return cached
+
         try:
             crops_collection = await self._get_collection("crops")
             crop_info = await crops_collection.find_one({"_id": crop_id})
+            if crop_info:
+                _store_cached(_crop_cache, crop_id, crop_info)
             return crop_info or {}
 
         except Exception as e:
-            logger.error(f"作物情報取得エラー: {e}")
+            logger.error("作物情報取得エラー: %s", e)
             return {}
 
     async def get_crop_name(self, crop_id: ObjectId) -> str:
         """作物名取得の共通メソッド"""
-        crop_info = await self.get_crop_info(crop_id)
-        return crop_info.get("name", "不明")
+        cached = _get_cached(_crop_cache, crop_id)
+        if cached is not None:
+            return cached.get("name", "不明")
+
+        try:
+            crops_collection = await self._get_collection("crops")
+            crop_info = await crops_collection.find_one({"_id": crop_id}, {"name": 1})
+            return (crop_info or {}).get("name", "不明")
+
+        except Exception as e:
+            logger.error("作物名取得エラー: %s", e)
+            return "不明"
 
     async def get_material_info(self, material_id: ObjectId) -> Dict[str, Any]:
         """資材情報取得の共通メソッド"""
+        cached = _get_cached(_material_cache, material_id)
+        if cached is not None:
+            return cached
+
         try:
             materials_collection = await self._get_collection("materials")
             material_info = await materials_collection.find_one({"_id": material_id})
+            if material_info:
+                _store_cached(_material_cache, material_id, material_info)
             return material_info or {}
 
         except Exception as e:
-            logger.error(f"資材情報取得エラー: {e}")
+            logger.error("資材情報取得エラー: %s", e)
             return {}
 
     async def search_work_logs(self, query_params: Dict[str, Any], user_id: str) -> List[Dict[str, Any]]:
@@ -92,30 +224,21 @@ class DataAccessLayer:
                 date_range = query_params["date_range"]
                 query["work_date"] = {"$gte": date_range["start"], "$lte": date_range["end"]}
 
-            # 圃場フィルタ
-            if query_params.get("field_names"):
-                field_conditions = []
-                for field_name in query_params["field_names"]:
-                    field_conditions.extend(
-                        [
-                            {"extracted_data.field_name": {"$regex": field_name, "$options": "i"}},
-                            {"original_message": {"$regex": field_name, "$options": "i"}},
-                        ]
-                    )
-                if field_conditions:
-                    # 既存の $or 条件と結合
-                    if "$or" in query:
-                        query["$and"] = [{"$or": query["$or"]}, {"$or": field_conditions}]
-                        del query["$or"]
-                    else:
-                        query["$or"] = field_conditions
+            # 圃場フィルタ（複数の圃場名は1つの選択パターンにまとめる）
+            field_names = query_params.get("field_names")
+            if field_names:
+                field_regex = {"$regex": "|".join(map(re.escape, field_names)), "$options": "i"}
+                query["$or"] = [
+                    {"extracted_data.field_name": field_regex},
+                    {"original_message": field_regex},
+                ]
 
             # 作業種別フィルタ
             if query_params.get("work_categories"):
                 query["category"] = {"$in": query_params["work_categories"]}
 
             # 検索実行
-            cursor = work_logs_collection.find(query)
+            cursor = work_logs_collection.find(query, _WORK_LOG_PROJECTION)
 
             # ソート
             if query_params.get("sort_order") == "desc":
@@ -124,29 +247,39 @@ class DataAccessLayer:
                 cursor = cursor.sort("work_date", 1)
 
             # 件数制限
-            cursor = cursor.limit(query_params.get("limit", 50))
+            limit = query_params.get("limit", 50)
+            cursor = cursor.limit(limit).batch_size(min(limit, _CURSOR_BATCH_SIZE) or _CURSOR_BATCH_SIZE)
 
             results = await cursor.to_list(None)
-            logger.info(f"DataAccessLayer: 作業記録検索結果: {len(results)}件")
+            logger.info("DataAccessLayer: 作業記録検索結果: %d件", len(results))
 
             return results
 
         except Exception as e:
-            logger.error(f"DataAccessLayer: 作業記録検索エラー: {e}")
+            logger.error("DataAccessLayer: 作業記録検索エラー: %s", e)
             return []
 
     async def find_fields_by_name(self, name: str):
         """後方互換: 圃場名で曖昧検索し、圃場ドキュメントリストを返す"""
+        # 空の検索語は全件に一致してしまうため、問い合わせ前に打ち切る
+        name = name.strip()
+        if not name:
+            return []
+
         try:
             # 接続確認
             if not self.mongodb_client.is_connected:
                 await self.mongodb_client.connect()
 
             fields_collection = await self._get_collection("fields")
-            cursor = fields_collection.find({"name": {"$regex": name, "$options": "i"}})
+
+            # 部分一致で検索する（入力は正規表現としてではなく文字列として扱う）
+            cursor = fields_collection.find(
+                {"name": {"$regex": re.escape(name), "$options": "i"}}, _FIELD_PROJECTION
+            ).batch_size(_CURSOR_BATCH_SIZE)
             return await cursor.to_list(None)
         except Exception as e:
-            logger.error(f"圃場検索エラー: {e}")
+            logger.error("圃場検索エラー: %s", e)
             return []
 
 
@@ -163,4 +296,4 @@ class DataAccess(DataAccessLayer):
     """
 
     def __init__(self, client: MongoDBClient = None):
-        super().__init__(client if client else MongoDBClient())
+        super().__init__(client)
@@ -3,40 +3,39 @@ MongoDBドキュメントモデル定義
 """
 
 from datetime import datetime
-from typing import List, Optional, Dict, Any
-from pydantic import BaseModel, Field
+from typing import Annotated, List, Optional, Dict, Any
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field, PlainSerializer, WithJsonSchema
 from bson import ObjectId
+from bson.errors import InvalidId
 
 
-class PyObjectId(ObjectId):
-    """PydanticでObjectIdを使用するための拡張クラス"""
-    
-    @classmethod
-    def __get_validators__(cls):
-        yield cls.validate
-    
-    @classmethod
-    def validate(cls, v):
-        if not ObjectId.is_valid(v):
-            raise ValueError("Invalid ObjectId")
+def _validate_object_id(v: Any) -> ObjectId:
+    """ObjectId（または16進文字列）の検証"""
+    if isinstance(v, ObjectId):
+        return v
+    try:
         return ObjectId(v)
-    
-    @classmethod
-    def __modify_schema__(cls, field_schema):
-        field_schema.update(type="string")
+    except (InvalidId, TypeError) as e:
+        raise ValueError("Invalid ObjectId") from e
+
+
+# PydanticでObjectIdを使用するための型（JSONでは文字列として扱う）
+PyObjectId = Annotated[
+    ObjectId,
+    BeforeValidator(_validate_object_id),
+    PlainSerializer(str, return_type=str, when_used="json"),
+    WithJsonSchema({"type": "string"}),
+]
 
 
 class BaseDocument(BaseModel):
     """基底ドキュメントクラス"""
     
-    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+    model_config = ConfigDict(populate_by_name=True, arbitrary_types_allowed=True)
+    
+    id: PyObjectId = Field(default_factory=ObjectId, alias="_id")
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
-    
-    class Config:
-        allow_population_by_field_name = True
-        arbitrary_types_allowed = True
-        json_encoders = {ObjectId: str}
 
 
 class CropDocument(BaseDocument):
@@ -3,8 +3,10 @@ MongoDB接続とクライアント管理
 """
 
 import asyncio
+import time
 from typing import Optional, Dict, Any
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
 import logging
 
@@ -12,6 +14,23 @@ from ..core.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 検索クエリ（DataAccessLayer.search_work_logs）の形に合わせたインデックス
+WORK_LOG_INDEXES = [
+    IndexModel([("user_id", ASCENDING), ("work_date", DESCENDING)], name="user_work_date"),
+    IndexModel(
+        [("user_id", ASCENDING), ("category", ASCENDING), ("work_date", DESCENDING)],
+        name="user_category_work_date",
+    ),
+]
+
+# 圃場コード検索（QueryParser / MasterDataResolver）用インデックス
+FIELD_INDEXES = [
+    IndexModel([("field_code", ASCENDING)], name="field_code"),
+]
+
+# ヘルスチェック結果（serverStatus）を再利用する秒数（期限内は ping のみ行う）
+HEALTH_CHECK_TTL = 5.0
+
 
 class MongoDBClient:
     """MongoDB接続クライアント"""
@@ -20,6 +39,10 @@ class MongoDBClient:
         self.connection_string = connection_string or settings.mongodb.connection_string
         self.client: Optional[AsyncIOMotorClient] = None
         self.database: Optional[AsyncIOMotorDatabase] = None
+        # 直近の正常なヘルスチェック結果: (取得時刻, 結果)
+        self._last_health: Optional[tuple] = None
+        # 接続を確立したイベントループ（motor のクライアントはこのループでのみ使用できる）
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
     async def __aenter__(self):
         """非同期コンテキストマネージャーの開始"""
@@ -49,11 +72,13 @@ class MongoDBClient:
                 connectTimeoutMS=mongo_settings.connect_timeout,
                 maxPoolSize=mongo_settings.max_pool_size,
                 minPoolSize=mongo_settings.min_pool_size,
+                maxIdleTimeMS=mongo_settings.max_idle_time,
             )
             
             # 接続テスト
             await self.client.admin.command('ping')
             self.database = self.client[mongo_settings.database_name]
+            self._loop = asyncio.get_running_loop()
             
             logger.info("MongoDB接続が正常に確立されました")
             
@@ -67,8 +92,33 @@ class MongoDBClient:
             self.client.close()
             self.client = None
             self.database = None
+            self._last_health = None
+            self._loop = None
             logger.info("MongoDB接続を切断しました")
     
+    async def ensure_indexes(self) -> None:
+        """検索用インデックスの作成とウォームアップ（冪等）"""
+        if self.database is None:
+            raise RuntimeError("データベース接続が確立されていません")
+
+        work_logs = self.database["work_logs"]
+        await work_logs.create_indexes(WORK_LOG_INDEXES)
+        # 初回のユーザー検索がコールドキャッシュを踏まないよう、検索と同じインデックスで1件読んでおく
+        await (
+            work_logs.find({}, {"_id": 1})
+            .sort([("user_id", ASCENDING), ("work_date", DESCENDING)])
+            .hint("user_work_date")
+            .limit(1)
+            .to_list(1)
+        )
+
+        # 圃場コードのインデックス作成に失敗しても作業記録の検索用インデックスは使えるようにする
+        try:
+            await self.database["fields"].create_indexes(FIELD_INDEXES)
+        except Exception as e:
+            logger.warning("fields インデックスの作成に失敗しました: %s", e)
+        logger.info("検索用インデックスの準備が完了しました")
+
     async def get_collection(self, collection_name: str):
         """指定されたコレクションを取得"""
         if self.database is None:
@@ -81,25 +131,39 @@ class MongoDBClient:
             if self.client is None:
                 return {"status": "error", "message": "接続未確立"}
             
-            # ping test
+            # 死活確認は軽い ping で毎回行う
             await self.client.admin.command('ping')
             
+            # serverStatus は重いため、短時間の連続呼び出し（ロードバランサーの監視など）では直近の結果を返す
+            if self._last_health is not None:
+                checked_at, result = self._last_health
+                if time.monotonic() - checked_at < HEALTH_CHECK_TTL:
+                    return dict(result)
+            
             # サーバー情報取得
             server_info = await self.client.admin.command('serverStatus')
             
-            return {
+            result = {
                 "status": "healthy",
                 "host": server_info.get("host", "unknown"),
                 "version": server_info.get("version", "unknown"),
                 "uptime": server_info.get("uptime", 0)
             }
+            self._last_health = (time.monotonic(), result)
+            return dict(result)
         except Exception as e:
+            self._last_health = None
             return {"status": "error", "message": str(e)}
     
     @property
     def is_connected(self) -> bool:
-        """接続状態の確認"""
-        return self.client is not None and self.database is not None
+        """接続状態の確認（別のイベントループで確立した接続は未接続として扱う）"""
+        if self.client is None or self.database is None:
+            return False
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return True
 
 
 # ファクトリー関数
@@ -109,4 +173,18 @@ def create_mongodb_client(connection_string: Optional[str] = None) -> MongoDBCli
 
 
 # グローバルMongoDBクライアントインスタンス（後方互換性のため）
-mongodb_client = MongoDBClient()
\ No newline at end of file
+mongodb_client = MongoDBClient()
+
+# 常駐イベントループ（core.event_loop）専用のクライアント。
+# motor のクライアントは最初に使われたイベントループに束縛されるため、
+# 呼び出し側のループ（uvicorn / asyncio.run）で使う mongodb_client とは共有しない
+background_mongodb_client = MongoDBClient()
+
+
+def get_mongodb_client() -> MongoDBClient:
+    """現在のイベントループで使用する共有クライアントを取得"""
+    from ..core.event_loop import is_background_loop
+
+    if is_background_loop():
+        return background_mongodb_client
+    return mongodb_client
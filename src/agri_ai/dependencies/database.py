@@ -5,7 +5,7 @@
 """
 
 from typing import Optional
-from ..database.mongodb_client import MongoDBClient, create_mongodb_client
+from ..database.mongodb_client import MongoDBClient, get_mongodb_client
 
 
 class DatabaseConnection:
@@ -16,26 +16,29 @@ class DatabaseConnection:
     
     async def get_client(self) -> MongoDBClient:
         """MongoDB クライアントを取得"""
-        # 常に新しいクライアントを作成してイベントループ問題を回避
-        if self._client is None or not self._client.is_connected:
-            self._client = create_mongodb_client()
-            await self._client.connect()
+        # 指定がなければ実行中のイベントループに対応する共有クライアント（接続プール）を再利用する
+        client = self._client if self._client is not None else get_mongodb_client()
+        if not client.is_connected:
+            await client.connect()
         
-        return self._client
+        return client
     
     async def disconnect(self):
         """接続を切断"""
+        # 共有クライアントはアプリケーション終了時（lifespan）にのみ切断する
+        if self._client is None:
+            return
         if self._client and self._client.is_connected:
             await self._client.disconnect()
 
 
-# グローバル接続インスタンス（必要に応じて）
+# グローバル接続インスタンス
 _db_connection: Optional[DatabaseConnection] = None
 
 
 def get_database_connection() -> DatabaseConnection:
-    """データベース接続を取得"""
+    """データベース接続を取得（プロセス内で共有）"""
     global _db_connection
-    # イベントループ問題を回避するため常に新しいインスタンスを作成
-    _db_connection = DatabaseConnection()
-    return _db_connection
\ No newline at end of file
+    if _db_connection is None:
+        _db_connection = DatabaseConnection()
+    return _db_connection
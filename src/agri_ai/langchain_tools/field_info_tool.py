@@ -1,6 +1,13 @@
+import re
 from typing import Any, List
 from .base_tool import AgriAIBaseTool
 
+# 検索結果の最大件数
+_MAX_RESULTS = 10
+
+# _format_result で参照するフィールドのみ取得する
+_FIELD_PROJECTION = {"_id": 0, "field_name": 1, "area": 1}
+
 
 class FieldInfoTool(AgriAIBaseTool):
     name: str = "field_info"
@@ -9,17 +16,21 @@ class FieldInfoTool(AgriAIBaseTool):
     )
 
     async def _arun(self, query: str) -> str:
-        if not self.mongodb_client or not self.mongodb_client.is_connected:
-            await self.mongodb_client.connect()
+        # 空の検索語は全件に一致してしまうため、問い合わせ前に打ち切る
+        query = query.strip()
+        if not query:
+            return "情報が見つかりませんでした。"
 
-        db = self.mongodb_client.get_database()
-        collection = db["fields"]
+        client = self._get_mongodb_client()
+        if not client.is_connected:
+            await client.connect()
 
-        # 簡易的な検索クエリ
-        search_filter = {"field_name": {"$regex": query, "$options": "i"}}
+        collection = await client.get_collection("fields")
 
-        cursor = collection.find(search_filter)
-        fields = await cursor.to_list(length=10)  # 最大10件まで
+        # 部分一致で検索する（入力は正規表現としてではなく文字列として扱う）
+        fields = await collection.find(
+            {"field_name": {"$regex": re.escape(query), "$options": "i"}}, _FIELD_PROJECTION
+        ).limit(_MAX_RESULTS).to_list(length=_MAX_RESULTS)
 
         if not fields:
             return f"「{query}」に一致する圃場は見つかりませんでした。"
@@ -29,8 +40,4 @@ class FieldInfoTool(AgriAIBaseTool):
         if not result:
             return "情報が見つかりませんでした。"
 
-        formatted_results = []
-        for field in result:
-            info = f"圃場名: {field.get('field_name')}, 面積: {field.get('area')}㎡"
-            formatted_results.append(info)
-        return "\n".join(formatted_results)
+        return "\n".join(f"圃場名: {field.get('field_name')}, 面積: {field.get('area')}㎡" for field in result)
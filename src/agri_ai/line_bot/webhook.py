@@ -2,6 +2,7 @@
 LINE Bot Webhook実装
 """
 
+from contextlib import asynccontextmanager
 from typing import Dict, Any
 from fastapi import FastAPI, Request, HTTPException
 from linebot import LineBotApi, WebhookHandler
@@ -11,12 +12,26 @@ import logging
 import concurrent.futures
 
 from ..core.config import settings
-from ..core.master_agent import master_agent
+from ..core.master_agent import get_master_agent
+from ..database.mongodb_client import mongodb_client
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """起動時にMongoDBへ1度だけ接続し、終了時に切断する"""
+    await mongodb_client.connect()
+    try:
+        await mongodb_client.ensure_indexes()
+    except Exception as e:
+        logger.warning("インデックスのウォームアップに失敗しました: %s", e)
+    yield
+    await mongodb_client.disconnect()
+
+
 # FastAPIアプリケーションの作成
-app = FastAPI(title="農業AI LINE Webhook", version="1.0.0")
+app = FastAPI(title="農業AI LINE Webhook", version="1.0.0", lifespan=lifespan)
 
 # LINE Bot APIの初期化
 line_bot_api = LineBotApi(settings.line_bot.channel_access_token)
@@ -33,19 +48,13 @@ async def root():
 async def health_check():
     """詳細なヘルスチェック"""
     try:
-        # MongoDB接続チェック（新しい接続を作成）
-        from ..database.mongodb_client import create_mongodb_client
-        
-        test_client = create_mongodb_client()
-        db_health = await test_client.health_check()
-        
-        # テスト用クライアントを閉じる
-        await test_client.disconnect()
+        # 起動時に接続した共有クライアントで確認する（serverStatus の結果は短時間再利用される）
+        db_health = await mongodb_client.health_check()
 
         return {
             "status": "healthy",
             "database": db_health,
-            "agent": "initialized" if master_agent.agent_executor else "not_initialized",
+            "agent": "initialized" if get_master_agent().agent_executor else "not_initialized",
         }
     except Exception as e:
         return {"status": "unhealthy", "error": str(e)}
@@ -89,6 +98,8 @@ async def webhook(request: Request):
 async def _process_message_async(message_text: str, user_id: str, reply_token: str):
     """非同期でメッセージを処理する関数"""
     try:
+        master_agent = get_master_agent()
+
         # MasterAgentが初期化されているか確認
         if not master_agent.agent_executor:
             logger.info("MasterAgentが初期化されていません。初回リクエストのため初期化します。")
@@ -8,14 +8,34 @@ FieldNameExtractor: データベースベースの動的圃場名抽出システ
 4. ユーザー別の圃場名も考慮
 """
 
+import heapq
 import re
 import logging
+from operator import itemgetter
 from typing import Dict, List, Optional, Tuple
 from difflib import SequenceMatcher
-from ..database.mongodb_client import create_mongodb_client
+from ..dependencies.database import get_database_connection
 
 logger = logging.getLogger(__name__)
 
+# 結果として返す候補数
+_MAX_CANDIDATES = 3
+
+# あいまい一致として採用する類似度の下限
+_FUZZY_MATCH_THRESHOLD = 0.6
+# あいまい一致の候補として残す総合スコアの下限
+_FUZZY_CANDIDATE_THRESHOLD = 0.3
+
+# 正規表現フォールバック用パターン（インポート時に1度だけコンパイル）
+_FALLBACK_PATTERNS = (
+    re.compile(r'「([^」]+)」'),                         # 「圃場名」
+    re.compile(r'([^のを\s]{2,})の(?:面積|情報|詳細|状況)'),  # 2文字以上の圃場名
+    re.compile(r'([^のを\s]{2,})を(?:登録|追加)'),         # 2文字以上の圃場名
+    re.compile(r'([^のを\s]{2,})は(?:どこ|何)'),           # 2文字以上の圃場名
+    re.compile(r'([一-龯]+[畑田圃場ハウス]+\d*)'),         # 日本語＋畑/田/圃場/ハウス
+    re.compile(r'([A-Za-z]+[畑田圃場ハウス]+\d*)'),        # 英語＋畑/田/圃場/ハウス
+)
+
 
 class FieldNameExtractor:
     """データベースベースの動的圃場名抽出サービス"""
@@ -74,34 +94,29 @@ class FieldNameExtractor:
             current_time - self.last_cache_time < self.cache_timeout):
             return self.field_cache
         
-        # データベースから取得
-        client = create_mongodb_client()
-        try:
-            await client.connect()
-            fields_collection = await client.get_collection("fields")
-            
-            # 全圃場の名前を取得
-            fields = await fields_collection.find(
-                {}, 
-                {"name": 1, "field_code": 1}
-            ).to_list(1000)
-            
-            field_names = []
-            for field in fields:
-                if field.get("name"):
-                    field_names.append(field["name"])
-                if field.get("field_code"):
-                    field_names.append(field["field_code"])
-            
-            # キャッシュ更新
-            self.field_cache = field_names
-            self.last_cache_time = current_time
-            
-            logger.info(f"データベースから{len(field_names)}個の圃場名を取得")
-            return field_names
-            
-        finally:
-            await client.disconnect()
+        # データベースから取得（共有クライアントの接続プールを再利用する）
+        client = await get_database_connection().get_client()
+        fields_collection = await client.get_collection("fields")
+        
+        # 全圃場の名前を取得
+        fields = await fields_collection.find(
+            {}, 
+            {"_id": 0, "name": 1, "field_code": 1}
+        ).to_list(1000)
+        
+        field_names = []
+        for field in fields:
+            if field.get("name"):
+                field_names.append(field["name"])
+            if field.get("field_code"):
+                field_names.append(field["field_code"])
+        
+        # キャッシュ更新
+        self.field_cache = field_names
+        self.last_cache_time = current_time
+        
+        logger.info(f"データベースから{len(field_names)}個の圃場名を取得")
+        return field_names
     
     async def _multi_stage_extraction(self, query: str, field_names: List[str]) -> Dict[str, any]:
         """段階的圃場名抽出"""
@@ -124,19 +139,19 @@ class FieldNameExtractor:
                 'field_name': best_match,
                 'confidence': 0.8,
                 'method': 'partial_match',
-                'candidates': partial_matches[:3]  # 上位3候補
+                'candidates': partial_matches  # 上位3候補
             }
         
         # Stage 3: あいまい一致（編集距離ベース）
         fuzzy_matches = self._fuzzy_match(query, field_names)
         if fuzzy_matches:
             best_match, similarity = fuzzy_matches[0]
-            if similarity > 0.6:  # 60%以上の類似度
+            if similarity > _FUZZY_MATCH_THRESHOLD:
                 return {
                     'field_name': best_match,
                     'confidence': similarity,
                     'method': 'fuzzy_match',
-                    'candidates': [match[0] for match in fuzzy_matches[:3]]
+                    'candidates': [match[0] for match in fuzzy_matches]
                 }
         
         # Stage 4: 正規表現フォールバック
@@ -165,7 +180,7 @@ class FieldNameExtractor:
         return None
     
     def _partial_match(self, query: str, field_names: List[str]) -> List[str]:
-        """部分一致検索（長い順にソート）"""
+        """部分一致検索（長い順に上位の候補のみ）"""
         matches = []
         for field_name in field_names:
             # 圃場名の一部がクエリに含まれているか
@@ -175,19 +190,19 @@ class FieldNameExtractor:
             elif any(part in field_name for part in query.split()):
                 matches.append(field_name)
         
-        # 長い順にソート（より具体的なマッチを優先）
-        return sorted(set(matches), key=len, reverse=True)
+        # 長い順（より具体的なマッチを優先）。全件ソートせず上位のみ取り出す
+        return heapq.nlargest(_MAX_CANDIDATES, set(matches), key=len)
     
     def _fuzzy_match(self, query: str, field_names: List[str]) -> List[Tuple[str, float]]:
-        """あいまい一致検索（編集距離ベース）"""
+        """あいまい一致検索（編集距離ベース、スコア上位の候補のみ）"""
         similarities = []
+        query_words = query.split()
         
         for field_name in field_names:
             # 全体の類似度
             similarity = SequenceMatcher(None, query, field_name).ratio()
             
             # 個別単語の最大類似度も考慮
-            query_words = query.split()
             field_words = field_name.split()
             
             max_word_similarity = 0.0
@@ -199,26 +214,16 @@ class FieldNameExtractor:
             # 総合スコア（全体類似度と単語類似度の平均）
             final_score = (similarity + max_word_similarity) / 2
             
-            if final_score > 0.3:  # 30%以上の類似度のみ
+            if final_score > _FUZZY_CANDIDATE_THRESHOLD:
                 similarities.append((field_name, final_score))
         
-        # スコア順にソート
-        return sorted(similarities, key=lambda x: x[1], reverse=True)
+        # スコア順。全件ソートせず上位のみ取り出す
+        return heapq.nlargest(_MAX_CANDIDATES, similarities, key=itemgetter(1))
     
     def _regex_fallback(self, query: str) -> Optional[str]:
         """正規表現フォールバック（改良版）"""
-        # より柔軟な正規表現パターン
-        patterns = [
-            r'「([^」]+)」',           # 「圃場名」
-            r'([^のを\s]{2,})の(?:面積|情報|詳細|状況)',  # 2文字以上の圃場名
-            r'([^のを\s]{2,})を(?:登録|追加)',         # 2文字以上の圃場名
-            r'([^のを\s]{2,})は(?:どこ|何)',           # 2文字以上の圃場名
-            r'([一-龯]+[畑田圃場ハウス]+\d*)',         # 日本語＋畑/田/圃場/ハウス
-            r'([A-Za-z]+[畑田圃場ハウス]+\d*)',        # 英語＋畑/田/圃場/ハウス
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, query)
+        for pattern in _FALLBACK_PATTERNS:
+            match = pattern.search(query)
             if match:
                 extracted = match.group(1)
                 # 最小長チェック
@@ -237,6 +242,17 @@ class FieldNameExtractor:
         }
 
 
+_field_name_extractor: Optional[FieldNameExtractor] = None
+
+
+def get_field_name_extractor() -> FieldNameExtractor:
+    """FieldNameExtractorの共有インスタンス取得（圃場名キャッシュをプロセス内で共有）"""
+    global _field_name_extractor
+    if _field_name_extractor is None:
+        _field_name_extractor = FieldNameExtractor()
+    return _field_name_extractor
+
+
 # 使用例とテスト用の関数
 async def test_field_name_extractor():
     """FieldNameExtractorのテスト実行"""
@@ -5,13 +5,84 @@ MasterDataResolver: マスターデータとの連携・ID変換サービス
 作業記録システムでのデータ正規化と統合分析を実現する。
 """
 
+import asyncio
 import logging
-from typing import Dict, List
+import time
+from functools import lru_cache
+from typing import Dict, List, Tuple
 from difflib import SequenceMatcher
 from ..dependencies.database import DatabaseConnection
 
 logger = logging.getLogger(__name__)
 
+# あいまい一致として採用する類似度の下限
+_FUZZY_THRESHOLD = 0.6
+# 部分一致の信頼度の上限
+_PARTIAL_MATCH_MAX_CONFIDENCE = 0.8
+
+
+@lru_cache(maxsize=4096)
+def _fuzzy_similarity(text: str, candidate: str) -> float:
+    """
+    あいまい一致の類似度（閾値を超え得ない組み合わせは ratio() を計算せず 0.0）
+    
+    同じ入力（"A畑" など）とマスター名称の組み合わせは繰り返し現れるため結果をキャッシュする。
+    """
+    # 文字数の比だけで閾値を超え得ない組み合わせは照合器を作らずに除外
+    total = len(text) + len(candidate)
+    if total and 2.0 * min(len(text), len(candidate)) / total <= _FUZZY_THRESHOLD:
+        return 0.0
+    
+    matcher = SequenceMatcher(None, text, candidate)
+    # quick_ratio() は ratio() の上限値のため、ここで足切りしても結果は変わらない
+    if matcher.quick_ratio() <= _FUZZY_THRESHOLD:
+        return 0.0
+    return matcher.ratio()
+
+
+def _build_field_index(fields_data: List[Dict]) -> Dict[str, tuple]:
+    """圃場名・圃場コード -> (圃場, 照合方法, None)"""
+    index: Dict[str, tuple] = {}
+    for field in fields_data:
+        for key in (field.get('name'), field.get('field_code')):
+            if key:
+                index.setdefault(key, (field, 'exact_match', None))
+    return index
+
+
+def _build_crop_index(crops_data: List[Dict]) -> Dict[str, tuple]:
+    """作物名・品種名 -> (作物, 照合方法, 品種名)"""
+    index: Dict[str, tuple] = {}
+    for crop in crops_data:
+        if crop.get('name'):
+            index.setdefault(crop['name'], (crop, 'exact_match', None))
+        for variety in crop.get('varieties', []):
+            variety_name = variety.get('name')
+            if variety_name:
+                index.setdefault(variety_name, (crop, 'variety_match', variety_name))
+    return index
+
+
+def _build_material_index(materials_data: List[Dict]) -> Dict[str, tuple]:
+    """資材名・別名 -> (資材, 照合方法, None)"""
+    index: Dict[str, tuple] = {}
+    for material in materials_data:
+        if material.get('name'):
+            index.setdefault(material['name'], (material, 'exact_match', None))
+        for alias in material.get('aliases', []):
+            if alias:
+                index.setdefault(alias, (material, 'alias_match', None))
+    return index
+
+
+def _build_char_index(records: List[Dict]) -> Dict[str, set]:
+    """名称に含まれる文字 -> レコード位置の集合（あいまい一致の候補絞り込み用）"""
+    index: Dict[str, set] = {}
+    for position, record in enumerate(records):
+        for char in set(record.get('name') or ''):
+            index.setdefault(char, set()).add(position)
+    return index
+
 
 class MasterDataResolver:
     """マスターデータとの照合・ID変換サービス"""
@@ -25,6 +96,14 @@ class MasterDataResolver:
         self.fields_cache_time = 0
         self.crops_cache_time = 0
         self.materials_cache_time = 0
+        # 照合結果キャッシュ: (種別, 入力文字列, マスター取得時刻) -> (取得時刻, 照合結果)
+        # マスターデータを再取得すると取得時刻が変わるため、古い照合結果は参照されなくなる
+        self.resolution_cache: Dict[tuple, tuple] = {}
+        self.resolution_cache_maxsize = 4096
+        # 照合用の名称索引: 索引種別 -> (元のマスターデータ, 索引)
+        self.master_index_cache: Dict[str, tuple] = {}
+        # コレクションハンドル: コレクション名 -> (取得元のデータベース, コレクション)
+        self.collection_cache: Dict[str, tuple] = {}
         self.db_connection = db_connection or DatabaseConnection()
     
     async def resolve_field_data(self, field_text: str) -> Dict[str, str]:
@@ -45,8 +124,15 @@ class MasterDataResolver:
         try:
             fields_data = await self._get_fields_data()
             
+            # 照合結果はマスター取得後の取得時刻をキーにする（期限切れのマスターは先に再取得される）
+            cache_key = ('field', field_text, self.fields_cache_time)
+            cached = self._get_cached_resolution(cache_key)
+            if cached is not None:
+                return cached
+            
             # 段階的照合
             result = self._multi_stage_field_matching(field_text, fields_data)
+            self._store_resolution(cache_key, result)
             
             if result['field_id']:
                 logger.info(f"圃場ID変換成功: '{field_text}' → {result['field_id']} (信頼度: {result['confidence']:.2f})")
@@ -83,8 +169,15 @@ class MasterDataResolver:
         try:
             crops_data = await self._get_crops_data()
             
+            # 照合結果はマスター取得後の取得時刻をキーにする（期限切れのマスターは先に再取得される）
+            cache_key = ('crop', crop_text, self.crops_cache_time)
+            cached = self._get_cached_resolution(cache_key)
+            if cached is not None:
+                return cached
+            
             # 段階的照合
             result = self._multi_stage_crop_matching(crop_text, crops_data)
+            self._store_resolution(cache_key, result)
             
             if result['crop_id']:
                 logger.info(f"作物ID変換成功: '{crop_text}' → {result['crop_id']} (信頼度: {result['confidence']:.2f})")
@@ -121,8 +214,15 @@ class MasterDataResolver:
         try:
             materials_data = await self._get_materials_data()
             
+            # 照合結果はマスター取得後の取得時刻をキーにする（期限切れのマスターは先に再取得される）
+            cache_key = ('material', material_text, self.materials_cache_time)
+            cached = self._get_cached_resolution(cache_key)
+            if cached is not None:
+                return cached
+            
             # 段階的照合
             result = self._multi_stage_material_matching(material_text, materials_data)
+            self._store_resolution(cache_key, result)
             
             if result['material_id']:
                 logger.info(f"資材ID変換成功: '{material_text}' → {result['material_id']} (信頼度: {result['confidence']:.2f})")
@@ -141,9 +241,81 @@ class MasterDataResolver:
                 'error': str(e)
             }
     
+    def _get_cached_resolution(self, cache_key: tuple):
+        """照合結果キャッシュの取得（期限切れは None）"""
+        entry = self.resolution_cache.get(cache_key)
+        if entry is None:
+            return None
+        
+        cached_time, result = entry
+        if time.time() - cached_time >= self.cache_timeout:
+            del self.resolution_cache[cache_key]
+            return None
+        
+        return dict(result)
+    
+    def _store_resolution(self, cache_key: tuple, result: Dict) -> None:
+        """照合結果をキャッシュに保存（上限超過時は古いものから破棄）"""
+        if len(self.resolution_cache) >= self.resolution_cache_maxsize:
+            self.resolution_cache.pop(next(iter(self.resolution_cache)))
+        self.resolution_cache[cache_key] = (time.time(), dict(result))
+    
+    def clear_cache(self) -> None:
+        """マスターデータ更新時にキャッシュを破棄する"""
+        self.fields_cache = None
+        self.crops_cache = None
+        self.materials_cache = None
+        self.fields_cache_time = 0
+        self.crops_cache_time = 0
+        self.materials_cache_time = 0
+        self.resolution_cache.clear()
+        self.master_index_cache.clear()
+    
+    def _get_master_index(self, kind: str, records: List[Dict], builder) -> Dict:
+        """照合用の名称索引を取得（マスターデータが更新された時のみ再構築）"""
+        entry = self.master_index_cache.get(kind)
+        if entry is not None and entry[0] is records:
+            return entry[1]
+        
+        index = builder(records)
+        self.master_index_cache[kind] = (records, index)
+        return index
+    
+    def _get_fuzzy_candidates(self, kind: str, text: str, records: List[Dict]) -> List[Dict]:
+        """
+        あいまい一致の候補を取得
+        
+        共通する文字が1つもない名称は類似度が0になるため、
+        入力と1文字以上共通するレコードのみを元の順序のまま返す。
+        """
+        char_index = self._get_master_index(f'{kind}_chars', records, _build_char_index)
+        positions = set()
+        for char in set(text):
+            positions.update(char_index.get(char, ()))
+        return [records[position] for position in sorted(positions)]
+    
+    async def get_all_masters(self) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """圃場・作物・資材マスターをまとめて取得（未キャッシュ分は並行して取得）"""
+        # 並行取得で接続が重複して確立されないよう、先に接続を確定させる
+        await self.db_connection.get_client()
+        return tuple(await asyncio.gather(
+            self._get_fields_data(),
+            self._get_crops_data(),
+            self._get_materials_data(),
+        ))
+    
+    async def _get_collection(self, collection_name: str):
+        """コレクションの取得（再接続されるまでハンドルを再利用）"""
+        client = await self.db_connection.get_client()
+        cached = self.collection_cache.get(collection_name)
+        if cached is not None and cached[0] is client.database:
+            return cached[1]
+        collection = await client.get_collection(collection_name)
+        self.collection_cache[collection_name] = (client.database, collection)
+        return collection
+    
     async def _get_fields_data(self) -> List[Dict]:
         """圃場マスターデータを取得（キャッシュ付き）"""
-        import time
         current_time = time.time()
         
         # キャッシュチェック
@@ -152,9 +324,8 @@ class MasterDataResolver:
             return self.fields_cache
         
         # データベースから取得
-        client = await self.db_connection.get_client()
         try:
-            fields_collection = await client.get_collection("fields")
+            fields_collection = await self._get_collection("fields")
             
             fields = await fields_collection.find(
                 {}, 
@@ -173,7 +344,6 @@ class MasterDataResolver:
     
     async def _get_crops_data(self) -> List[Dict]:
         """作物マスターデータを取得（キャッシュ付き）"""
-        import time
         current_time = time.time()
         
         # キャッシュチェック
@@ -182,9 +352,8 @@ class MasterDataResolver:
             return self.crops_cache
         
         # データベースから取得
-        client = await self.db_connection.get_client()
         try:
-            crops_collection = await client.get_collection("crops")
+            crops_collection = await self._get_collection("crops")
             
             crops = await crops_collection.find(
                 {}, 
@@ -203,7 +372,6 @@ class MasterDataResolver:
     
     async def _get_materials_data(self) -> List[Dict]:
         """資材マスターデータを取得（キャッシュ付き）"""
-        import time
         current_time = time.time()
         
         # キャッシュチェック
@@ -212,9 +380,8 @@ class MasterDataResolver:
             return self.materials_cache
         
         # データベースから取得
-        client = await self.db_connection.get_client()
         try:
-            materials_collection = await client.get_collection("materials")
+            materials_collection = await self._get_collection("materials")
             
             materials = await materials_collection.find(
                 {}, 
@@ -235,14 +402,15 @@ class MasterDataResolver:
         """圃場の段階的照合"""
         
         # Stage 1: 完全一致
-        for field in fields_data:
-            if field.get('name') == field_text or field.get('field_code') == field_text:
-                return {
-                    'field_id': str(field['_id']),
-                    'field_name': field.get('name', field.get('field_code')),
-                    'confidence': 1.0,
-                    'method': 'exact_match'
-                }
+        exact = self._get_master_index('field', fields_data, _build_field_index).get(field_text)
+        if exact is not None:
+            field = exact[0]
+            return {
+                'field_id': str(field['_id']),
+                'field_name': field.get('name', field.get('field_code')),
+                'confidence': 1.0,
+                'method': 'exact_match'
+            }
         
         # Stage 2: 部分一致
         partial_matches = []
@@ -263,17 +431,17 @@ class MasterDataResolver:
             return {
                 'field_id': str(best_field['_id']),
                 'field_name': best_field.get('name', best_field.get('field_code')),
-                'confidence': min(score, 0.8),
+                'confidence': min(score, _PARTIAL_MATCH_MAX_CONFIDENCE),
                 'method': 'partial_match'
             }
         
-        # Stage 3: あいまい一致
+        # Stage 3: あいまい一致（共通する文字を持つ候補のみ）
         fuzzy_matches = []
-        for field in fields_data:
+        for field in self._get_fuzzy_candidates('field', field_text, fields_data):
             field_name = field.get('name', '')
             if field_name:
-                similarity = SequenceMatcher(None, field_text, field_name).ratio()
-                if similarity > 0.6:
+                similarity = _fuzzy_similarity(field_text, field_name)
+                if similarity > _FUZZY_THRESHOLD:
                     fuzzy_matches.append((field, similarity))
         
         if fuzzy_matches:
@@ -296,27 +464,19 @@ class MasterDataResolver:
     def _multi_stage_crop_matching(self, crop_text: str, crops_data: List[Dict]) -> Dict[str, any]:
         """作物の段階的照合"""
         
-        # Stage 1: 完全一致
-        for crop in crops_data:
-            if crop.get('name') == crop_text:
-                return {
-                    'crop_id': str(crop['_id']),
-                    'crop_name': crop.get('name'),
-                    'confidence': 1.0,
-                    'method': 'exact_match'
-                }
-            
-            # 品種名での照合
-            varieties = crop.get('varieties', [])
-            for variety in varieties:
-                if variety.get('name') == crop_text:
-                    return {
-                        'crop_id': str(crop['_id']),
-                        'crop_name': crop.get('name'),
-                        'variety': variety.get('name'),
-                        'confidence': 1.0,
-                        'method': 'variety_match'
-                    }
+        # Stage 1: 完全一致（作物名・品種名）
+        exact = self._get_master_index('crop', crops_data, _build_crop_index).get(crop_text)
+        if exact is not None:
+            crop, method, variety_name = exact
+            result = {
+                'crop_id': str(crop['_id']),
+                'crop_name': crop.get('name'),
+                'confidence': 1.0,
+                'method': method
+            }
+            if variety_name is not None:
+                result['variety'] = variety_name
+            return result
         
         # Stage 2: 部分一致
         partial_matches = []
@@ -335,17 +495,17 @@ class MasterDataResolver:
             return {
                 'crop_id': str(best_crop['_id']),
                 'crop_name': best_crop.get('name'),
-                'confidence': min(score, 0.8),
+                'confidence': min(score, _PARTIAL_MATCH_MAX_CONFIDENCE),
                 'method': 'partial_match'
             }
         
-        # Stage 3: あいまい一致
+        # Stage 3: あいまい一致（共通する文字を持つ候補のみ）
         fuzzy_matches = []
-        for crop in crops_data:
+        for crop in self._get_fuzzy_candidates('crop', crop_text, crops_data):
             crop_name = crop.get('name', '')
             if crop_name:
-                similarity = SequenceMatcher(None, crop_text, crop_name).ratio() 
-                if similarity > 0.6:
+                similarity = _fuzzy_similarity(crop_text, crop_name)
+                if similarity > _FUZZY_THRESHOLD:
                     fuzzy_matches.append((crop, similarity))
         
         if fuzzy_matches:
@@ -368,25 +528,16 @@ class MasterDataResolver:
     def _multi_stage_material_matching(self, material_text: str, materials_data: List[Dict]) -> Dict[str, any]:
         """資材の段階的照合"""
         
-        # Stage 1: 完全一致
-        for material in materials_data:
-            if material.get('name') == material_text:
-                return {
-                    'material_id': str(material['_id']),
-                    'material_name': material.get('name'),
-                    'confidence': 1.0,
-                    'method': 'exact_match'
-                }
-            
-            # エイリアス(別名)での照合
-            aliases = material.get('aliases', [])
-            if material_text in aliases:
-                return {
-                    'material_id': str(material['_id']),
-                    'material_name': material.get('name'),
-                    'confidence': 1.0,
-                    'method': 'alias_match'
-                }
+        # Stage 1: 完全一致（資材名・エイリアス）
+        exact = self._get_master_index('material', materials_data, _build_material_index).get(material_text)
+        if exact is not None:
+            material, method, _ = exact
+            return {
+                'material_id': str(material['_id']),
+                'material_name': material.get('name'),
+                'confidence': 1.0,
+                'method': method
+            }
         
         # Stage 2: 部分一致
         partial_matches = []
@@ -405,17 +556,17 @@ class MasterDataResolver:
             return {
                 'material_id': str(best_material['_id']),
                 'material_name': best_material.get('name'),
-                'confidence': min(score, 0.8),
+                'confidence': min(score, _PARTIAL_MATCH_MAX_CONFIDENCE),
                 'method': 'partial_match'
             }
         
-        # Stage 3: あいまい一致
+        # Stage 3: あいまい一致（共通する文字を持つ候補のみ）
         fuzzy_matches = []
-        for material in materials_data:
+        for material in self._get_fuzzy_candidates('material', material_text, materials_data):
             material_name = material.get('name', '')
             if material_name:
-                similarity = SequenceMatcher(None, material_text, material_name).ratio()
-                if similarity > 0.6:
+                similarity = _fuzzy_similarity(material_text, material_name)
+                if similarity > _FUZZY_THRESHOLD:
                     fuzzy_matches.append((material, similarity))
         
         if fuzzy_matches:
@@ -437,7 +588,6 @@ class MasterDataResolver:
     
     def get_cache_stats(self) -> Dict[str, any]:
         """キャッシュ統計情報を取得"""
-        import time
         return {
             'fields_cached': len(self.fields_cache) if self.fields_cache else 0,
             'crops_cached': len(self.crops_cache) if self.crops_cache else 0,
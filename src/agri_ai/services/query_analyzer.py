@@ -7,17 +7,114 @@ MasterAgentから切り出した、ユーザーの意図分析と実行プラン
 
 import re
 import logging
-from typing import Dict, Optional
-from .field_name_extractor import FieldNameExtractor
+import time
+from typing import Dict, Optional, Tuple
+from .field_name_extractor import get_field_name_extractor
 
 logger = logging.getLogger(__name__)
 
+# 「圃場名」のように明示された名前
+_QUOTED_NAME_PATTERN = re.compile(r'「([^」]+)」')
+
+# 圃場名抽出（フォールバック）用パターン
+_FIELD_NAME_PATTERNS = (
+    _QUOTED_NAME_PATTERN,                                    # 「圃場名」
+    re.compile(r'([^のを\s]{2,})の(?:面積|情報|詳細|状況)'),  # 2文字以上の圃場名
+    re.compile(r'([^のを\s]{2,})を(?:登録|追加)'),            # 2文字以上の圃場名
+    re.compile(r'([^のを\s]{2,})は(?:どこ|何)'),              # 2文字以上の圃場名
+)
+
+# 面積情報のパターン
+_AREA_PATTERNS = (
+    re.compile(r'(\d+\.?\d*)\s*ha'),
+    re.compile(r'(\d+\.?\d*)\s*ヘクタール'),
+    re.compile(r'(\d+\.?\d*)\s*㎡'),
+    re.compile(r'(\d+\.?\d*)\s*平方メートル'),
+)
+
+# 資材名のパターン
+_MATERIAL_NAME_PATTERNS = (
+    re.compile(r'「([^」]+)」'),  # 「農薬名」
+    re.compile(r'([^の\s]+)の希釈'),  # 農薬名の希釈
+    re.compile(r'([^を\s]+)を'),     # 農薬名を
+)
+
+# 意図・クエリタイプ判定用キーワード
+_REGISTRATION_KEYWORDS = ("登録", "追加", "新しい", "作成")
+_FIELD_KEYWORDS = ("圃場", "ハウス", "畑", "田")
+_FIELD_INFO_KEYWORDS = ("圃場", "ハウス", "畑", "面積", "作付け")
+_WEATHER_KEYWORDS = ("天気", "気温", "雨")
+_PEST_KEYWORDS = ("病気", "害虫", "症状")
+_HARVEST_KEYWORDS = ("収穫", "出荷", "販売")
+
+# キーワードカテゴリのビットフラグ
+_KW_REGISTRATION = 1 << 0
+_KW_FIELD = 1 << 1
+_KW_FIELD_INFO = 1 << 2
+_KW_WEATHER = 1 << 3
+_KW_PEST = 1 << 4
+_KW_HARVEST = 1 << 5
+
+_KEYWORD_FLAGS: Dict[str, int] = {}
+for _flag, _keywords in (
+    (_KW_REGISTRATION, _REGISTRATION_KEYWORDS),
+    (_KW_FIELD, _FIELD_KEYWORDS),
+    (_KW_FIELD_INFO, _FIELD_INFO_KEYWORDS),
+    (_KW_WEATHER, _WEATHER_KEYWORDS),
+    (_KW_PEST, _PEST_KEYWORDS),
+    (_KW_HARVEST, _HARVEST_KEYWORDS),
+):
+    for _keyword in _keywords:
+        _KEYWORD_FLAGS[_keyword] = _KEYWORD_FLAGS.get(_keyword, 0) | _flag
+
+# 全キーワードを1回の走査で検出する（先読みにより重なり合う出現も拾う）
+_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(map(re.escape, sorted(_KEYWORD_FLAGS, key=len, reverse=True))) + "))"
+)
+
+
+def _scan_keywords(message: str) -> int:
+    """メッセージに含まれるキーワードカテゴリのビットフラグを返す"""
+    flags = 0
+    for match in _KEYWORD_RE.finditer(message):
+        flags |= _KEYWORD_FLAGS[match.group(1)]
+    return flags
+
 
 class QueryAnalyzer:
     """ユーザークエリの分析・意図理解サービス"""
     
     def __init__(self):
-        self.field_name_extractor = FieldNameExtractor()
+        self.field_name_extractor = get_field_name_extractor()
+        # 同一メッセージの分析結果・実行プランのキャッシュ
+        self.analysis_cache: Dict[str, tuple] = {}
+        self.analysis_cache_maxsize = 512
+        self.cache_timeout = 300  # 5分キャッシュ
+    
+    async def analyze_and_plan(self, message: str) -> Tuple[Dict[str, any], str]:
+        """
+        クエリ分析と実行プラン生成をまとめて行う（同一メッセージはキャッシュを返す）
+        
+        Returns:
+            (analyze_query_intent()の結果, 実行プランのテキスト)
+        """
+        entry = self.analysis_cache.get(message)
+        if entry is not None:
+            cached_time, analysis_result, plan = entry
+            if time.time() - cached_time < self.cache_timeout:
+                return dict(analysis_result), plan
+            del self.analysis_cache[message]
+        
+        analysis_result = await self.analyze_query_intent(message)
+        plan = await self.create_execution_plan(analysis_result)
+        
+        # 分析失敗時の結果はキャッシュしない
+        if 'error' not in analysis_result:
+            if len(self.analysis_cache) >= self.analysis_cache_maxsize:
+                self.analysis_cache.pop(next(iter(self.analysis_cache)))
+            self.analysis_cache[message] = (time.time(), dict(analysis_result), plan)
+        
+        return analysis_result, plan
     
     async def analyze_query_intent(self, message: str) -> Dict[str, any]:
         """
@@ -50,7 +147,7 @@ class QueryAnalyzer:
             }
             
         except Exception as e:
-            logger.error(f"クエリ分析エラー: {e}")
+            logger.error("クエリ分析エラー: %s", e)
             return {
                 'intent': 'unknown',
                 'agent': 'field_agent',  # デフォルト
@@ -62,10 +159,10 @@ class QueryAnalyzer:
     
     def _analyze_basic_intent(self, message: str) -> Dict[str, any]:
         """基本的な意図分析"""
+        flags = _scan_keywords(message)
         
         # 圃場登録系
-        if any(keyword in message for keyword in ["登録", "追加", "新しい", "作成"]) and \
-           any(keyword in message for keyword in ["圃場", "ハウス", "畑", "田"]):
+        if flags & _KW_REGISTRATION and flags & _KW_FIELD:
             return {
                 'intent': 'field_registration',
                 'agent': 'field_registration_agent',
@@ -73,7 +170,7 @@ class QueryAnalyzer:
             }
         
         # 圃場情報系
-        if any(keyword in message for keyword in ["圃場", "ハウス", "畑", "面積", "作付け"]):
+        if flags & _KW_FIELD_INFO:
             return {
                 'intent': 'field_info',
                 'agent': 'field_agent',
@@ -161,7 +258,7 @@ class QueryAnalyzer:
                 return self._create_general_plan(analysis_result)
                 
         except Exception as e:
-            logger.error(f"実行プラン生成エラー: {e}")
+            logger.error("実行プラン生成エラー: %s", e)
             return "📋 実行プラン\n1. ユーザーリクエストを処理\n2. 結果をレポート"
     
     def _create_registration_plan(self, extracted_data: Dict[str, any]) -> str:
@@ -220,34 +317,31 @@ class QueryAnalyzer:
     
     async def _extract_field_name(self, message: str) -> str:
         """メッセージから圃場名を動的に抽出"""
+        # 「圃場名」のように明示されている場合はそのまま採用（DB照合を省略）
+        quoted = _QUOTED_NAME_PATTERN.search(message)
+        if quoted and len(quoted.group(1)) >= 2:
+            return quoted.group(1)
+        
         try:
             result = await self.field_name_extractor.extract_field_name(message)
             
             # 信頼度が50%以上の場合のみ採用
             if result['confidence'] >= 0.5:
-                logger.info(f"動的圃場名抽出成功: {result['field_name']} (信頼度: {result['confidence']:.2f})")
+                logger.info("動的圃場名抽出成功: %s (信頼度: %.2f)", result['field_name'], result['confidence'])
                 return result['field_name']
             else:
-                logger.info(f"動的圃場名抽出: 信頼度不足 ({result['confidence']:.2f})")
+                logger.info("動的圃場名抽出: 信頼度不足 (%.2f)", result['confidence'])
                 return ""
                 
         except Exception as e:
-            logger.error(f"動的圃場名抽出エラー: {e}")
+            logger.error("動的圃場名抽出エラー: %s", e)
             # フォールバック: 従来の正規表現方式
             return self._extract_field_name_fallback(message)
     
     def _extract_field_name_fallback(self, message: str) -> str:
         """フォールバック用の従来圃場名抽出"""
-        # 改良された正規表現パターン
-        field_patterns = [
-            r'「([^」]+)」',           # 「圃場名」
-            r'([^のを\s]{2,})の(?:面積|情報|詳細|状況)',  # 2文字以上の圃場名
-            r'([^のを\s]{2,})を(?:登録|追加)',         # 2文字以上の圃場名
-            r'([^のを\s]{2,})は(?:どこ|何)',           # 2文字以上の圃場名
-        ]
-        
-        for pattern in field_patterns:
-            match = re.search(pattern, message)
+        for pattern in _FIELD_NAME_PATTERNS:
+            match = pattern.search(message)
             if match:
                 extracted = match.group(1)
                 if len(extracted) >= 2:  # 最小長チェック
@@ -257,15 +351,8 @@ class QueryAnalyzer:
     
     def _extract_area(self, message: str) -> Optional[str]:
         """面積情報を抽出"""
-        area_patterns = [
-            r'(\d+\.?\d*)\s*ha',
-            r'(\d+\.?\d*)\s*ヘクタール',
-            r'(\d+\.?\d*)\s*㎡',
-            r'(\d+\.?\d*)\s*平方メートル',
-        ]
-        
-        for pattern in area_patterns:
-            match = re.search(pattern, message)
+        for pattern in _AREA_PATTERNS:
+            match = pattern.search(message)
             if match:
                 return match.group(0)
         
@@ -281,15 +368,8 @@ class QueryAnalyzer:
     
     def _extract_material_name(self, message: str) -> str:
         """メッセージから資材名を抽出"""
-        # 資材名のパターン
-        material_patterns = [
-            r'「([^」]+)」',  # 「農薬名」
-            r'([^の\s]+)の希釈',  # 農薬名の希釈
-            r'([^を\s]+)を',     # 農薬名を
-        ]
-        
-        for pattern in material_patterns:
-            match = re.search(pattern, message)
+        for pattern in _MATERIAL_NAME_PATTERNS:
+            match = pattern.search(message)
             if match:
                 return match.group(1)
         
@@ -297,11 +377,12 @@ class QueryAnalyzer:
     
     def _analyze_query_type(self, message: str) -> str:
         """クエリタイプを分析"""
-        if any(keyword in message for keyword in ["天気", "気温", "雨"]):
+        flags = _scan_keywords(message)
+        if flags & _KW_WEATHER:
             return "天気情報"
-        elif any(keyword in message for keyword in ["病気", "害虫", "症状"]):
+        elif flags & _KW_PEST:
             return "病害虫診断"
-        elif any(keyword in message for keyword in ["収穫", "出荷", "販売"]):
+        elif flags & _KW_HARVEST:
             return "収穫・出荷情報"
         else:
             return "農業全般の問い合わせ"
\ No newline at end of file
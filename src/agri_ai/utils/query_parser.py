@@ -10,6 +10,9 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 期間（開始日・終了日の組）を返す日付表現
+_RANGE_DATE_PATTERNS = frozenset({"今週", "来週", "先週", "今月", "来月"})
+
 
 class QueryParser:
     """自然言語クエリ解析クラス"""
@@ -82,7 +85,7 @@ class QueryParser:
             for pattern, handler in self.date_patterns.items():
                 if pattern in query:
                     if callable(handler):
-                        if pattern in ["今週", "来週", "先週", "今月", "来月"]:
+                        if pattern in _RANGE_DATE_PATTERNS:
                             start_date, end_date = handler()
                             return {"date_range": {"$gte": start_date, "$lt": end_date}, "pattern": pattern}
                         else:
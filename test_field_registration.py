@@ -6,7 +6,7 @@
 
 import asyncio
 from dotenv import load_dotenv
-from src.agri_ai.core.master_agent import master_agent
+from src.agri_ai.core.master_agent import get_master_agent
 
 # 環境変数を読み込み
 load_dotenv()
@@ -17,7 +17,8 @@ async def test_field_registration():
         print("🌾 圃場登録機能のテストを開始します...")
         
         # MasterAgentの初期化
-        master_agent.initialize()
+        agent = get_master_agent()
+        agent.initialize()
         print("✅ MasterAgent初期化完了")
         
         # テスト用の自然言語登録クエリ
@@ -37,7 +38,7 @@ async def test_field_registration():
             
             try:
                 # MasterAgentで登録処理
-                result = await master_agent.process_message_async(query, "test_user_registration")
+                result = await agent.process_message_async(query, "test_user_registration")
                 
                 # プランがある場合は表示
                 if result.get('plan'):
@@ -69,7 +70,7 @@ async def test_field_registration():
             print(f"📨 確認クエリ: {query}")
             
             try:
-                result = await master_agent.process_message_async(query, "test_user_verification")
+                result = await agent.process_message_async(query, "test_user_verification")
                 print(f"🤖 応答:")
                 # 長すぎる場合は切り詰める
                 response = result['response']
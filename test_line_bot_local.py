@@ -8,7 +8,7 @@ import json
 from datetime import datetime
 from dotenv import load_dotenv
 from src.agri_ai.line_bot.webhook import app
-from src.agri_ai.core.master_agent import master_agent
+from src.agri_ai.core.master_agent import get_master_agent
 
 # 環境変数を読み込み
 load_dotenv()
@@ -19,7 +19,8 @@ async def test_line_bot_functionality():
         print("📱 LINE Bot機能のローカルテストを開始します...")
         
         # MasterAgentの初期化
-        master_agent.initialize()
+        agent = get_master_agent()
+        agent.initialize()
         print("✅ MasterAgent初期化成功")
         
         # 模擬的なLINEメッセージイベントを作成
@@ -39,7 +40,7 @@ async def test_line_bot_functionality():
             
             try:
                 # MasterAgentでメッセージを処理
-                result = await master_agent.process_message_async(message, "test_user_line")
+                result = await agent.process_message_async(message, "test_user_line")
                 response = result.get('response', 'エラーが発生しました')
                 
                 # プランがある場合は表示
@@ -78,7 +79,7 @@ async def test_line_bot_functionality():
         print(f"❌ エラーが発生しました: {e}")
         raise
     finally:
-        # master_agent.shutdown()  # shutdownメソッドはないので削除
+        # agent.shutdown()  # shutdownメソッドはないので削除
         pass
 
 async def test_webhook_endpoints():
@@ -0,0 +1,73 @@
+"""
+テスト共通のフィクスチャ
+"""
+
+import re
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+
+class FakeClock:
+    """time.time() / time.monotonic() を差し替えるための時計"""
+
+    def __init__(self, now: float = 1_000_000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """キャッシュの期限判定に使う時刻を固定する（clock.now を書き換えて進める）"""
+    fake = FakeClock()
+    monkeypatch.setattr(time, "time", fake)
+    monkeypatch.setattr(time, "monotonic", fake)
+    return fake
+
+
+def _matches(document: dict, query: dict) -> bool:
+    """find() の条件（完全一致と $regex）を模した判定"""
+    for key, condition in query.items():
+        if isinstance(condition, dict) and "$regex" in condition:
+            flags = re.IGNORECASE if "i" in condition.get("$options", "") else 0
+            if not re.search(condition["$regex"], str(document.get(key, "")), flags):
+                return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+
+@pytest.fixture
+def mongo_documents():
+    """mongo_collection.find() の対象となるドキュメント（テスト中に書き換え可能）"""
+    return []
+
+
+@pytest.fixture
+def mongo_collection(mongo_documents):
+    """MongoDB コレクションのモック（find() は直前の条件で mongo_documents を絞り込む）"""
+    collection = MagicMock()
+    cursor = collection.find.return_value
+    for method in ("sort", "hint", "limit", "batch_size"):
+        getattr(cursor, method).return_value = cursor
+
+    def to_list(*args, **kwargs):
+        query = collection.find.call_args.args[0] if collection.find.call_args.args else {}
+        return [doc for doc in mongo_documents if _matches(doc, query)]
+
+    cursor.to_list = AsyncMock(side_effect=to_list)
+    collection.find_one = AsyncMock(return_value=None)
+    collection.create_indexes = AsyncMock()
+    return collection
+
+
+@pytest.fixture
+def mongo_client(mongo_collection):
+    """接続済み MongoDBClient のモック（どのコレクションも mongo_collection を返す）"""
+    client = MagicMock()
+    client.is_connected = True
+    client.get_collection = AsyncMock(return_value=mongo_collection)
+    client.database.__getitem__.return_value = mongo_collection
+    return client
@@ -0,0 +1,33 @@
+"""
+設定クラスの単体テスト
+"""
+
+import pytest
+
+from src.agri_ai.core.config import AppSettings, LangSmithSettings
+
+
+class TestFlagSettings:
+    """真偽値フラグの環境変数解釈のテスト"""
+
+    @pytest.mark.parametrize(
+        "value, expected",
+        [("true", True), ("True", True), ("false", False), ("", False), ("yes", False), ("1", False)],
+    )
+    def test_langsmith_tracing(self, monkeypatch, value, expected):
+        """LANGSMITH_TRACING は "true" のみ有効とし、それ以外は例外にせず無効とする"""
+        monkeypatch.setenv("LANGSMITH_TRACING", value)
+        assert LangSmithSettings().tracing_enabled is expected
+
+    @pytest.mark.parametrize("value, expected", [("TRUE", True), ("false", False), ("", False)])
+    def test_debug(self, monkeypatch, value, expected):
+        """DEBUG も同様に解釈する"""
+        monkeypatch.setenv("DEBUG", value)
+        assert AppSettings().debug is expected
+
+    def test_defaults(self, monkeypatch):
+        """未設定の場合は既定値を使う"""
+        monkeypatch.delenv("LANGSMITH_TRACING", raising=False)
+        monkeypatch.delenv("DEBUG", raising=False)
+        assert LangSmithSettings().tracing_enabled is False
+        assert AppSettings().debug is True
@@ -0,0 +1,107 @@
+"""
+DataAccessLayerの単体テスト
+"""
+
+import pytest
+from bson import ObjectId
+
+from src.agri_ai.database import data_access as data_access_module
+from src.agri_ai.database.data_access import DataAccessLayer, invalidate_master_cache
+
+
+@pytest.fixture
+def data_access(mongo_client):
+    """MongoDB クライアントをモックに差し替えたインスタンス"""
+    return DataAccessLayer(mongo_client)
+
+
+@pytest.fixture
+def master_cache(mongo_collection):
+    """作物・資材マスターキャッシュを空にし、find_one() が ID ごとのドキュメントを返すようにする"""
+    invalidate_master_cache()
+    mongo_collection.find_one.side_effect = lambda query, *args: {"_id": query["_id"], "name": "トマト"}
+    yield
+    invalidate_master_cache()
+
+
+class TestMasterCache:
+    """作物・資材マスターキャッシュのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_query(self, data_access, mongo_collection, master_cache, clock):
+        """期限内の同じIDは問い合わせない"""
+        crop_id = ObjectId()
+        first = await data_access.get_crop_info(crop_id)
+        second = await data_access.get_crop_info(crop_id)
+
+        assert first == second
+        assert mongo_collection.find_one.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_crop_name_uses_cached_crop(self, data_access, mongo_collection, master_cache, clock):
+        """get_crop_info で取得済みの作物名は問い合わせずに返す"""
+        crop_id = ObjectId()
+        await data_access.get_crop_info(crop_id)
+
+        assert await data_access.get_crop_name(crop_id) == "トマト"
+        assert mongo_collection.find_one.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_refetched(self, data_access, mongo_collection, master_cache, clock):
+        """期限切れのエントリは再取得する"""
+        material_id = ObjectId()
+        await data_access.get_material_info(material_id)
+        clock.now += data_access_module._MASTER_CACHE_TTL
+        await data_access.get_material_info(material_id)
+
+        assert mongo_collection.find_one.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_by_id(self, data_access, mongo_collection, master_cache, clock):
+        """指定したIDのみ破棄する"""
+        crop_id, other_id = ObjectId(), ObjectId()
+        await data_access.get_crop_info(crop_id)
+        await data_access.get_crop_info(other_id)
+
+        invalidate_master_cache(crop_id=crop_id)
+        await data_access.get_crop_info(crop_id)
+        await data_access.get_crop_info(other_id)
+
+        assert mongo_collection.find_one.await_count == 3
+
+    @pytest.mark.asyncio
+    async def test_cached_document_is_a_copy(self, data_access, master_cache, clock):
+        """呼び出し側が結果を書き換えてもキャッシュは影響を受けない"""
+        crop_id = ObjectId()
+        crop = await data_access.get_crop_info(crop_id)
+        crop["name"] = "changed"
+
+        assert (await data_access.get_crop_info(crop_id))["name"] == "トマト"
+
+
+@pytest.fixture
+def fields(mongo_documents):
+    """fields コレクションの圃場"""
+    mongo_documents.extend([{"name": "ハウスA"}, {"name": "トマトハウス"}, {"name": "第1圃場"}])
+    return mongo_documents
+
+
+class TestFindFieldsByName:
+    """圃場名検索のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_returns_all_substring_matches(self, data_access, fields):
+        """前方一致する圃場があっても部分一致の圃場を返す"""
+        found = await data_access.find_fields_by_name("ハウス")
+        assert {field["name"] for field in found} == {"ハウスA", "トマトハウス"}
+
+    @pytest.mark.asyncio
+    async def test_escapes_regex_metacharacters(self, data_access, fields):
+        """入力中の正規表現記号は文字として扱う"""
+        assert await data_access.find_fields_by_name(".*") == []
+
+    @pytest.mark.asyncio
+    async def test_blank_name_returns_nothing(self, data_access, mongo_client, fields):
+        """空の検索語は問い合わせない"""
+        assert await data_access.find_fields_by_name("  ") == []
+        mongo_client.get_collection.assert_not_called()
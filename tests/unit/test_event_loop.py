@@ -0,0 +1,53 @@
+"""
+常駐イベントループの単体テスト
+"""
+
+import asyncio
+import pytest
+
+from src.agri_ai.core.event_loop import run_coroutine_sync
+
+
+class TestRunCoroutineSync:
+    """run_coroutine_sync のテスト"""
+
+    def test_returns_result(self):
+        """コルーチンの結果をそのまま返す"""
+
+        async def answer():
+            return 42
+
+        assert run_coroutine_sync(answer()) == 42
+
+    def test_timeout_cancels_coroutine(self):
+        """タイムアウトしたコルーチンは常駐イベントループ上でキャンセルされる"""
+        cancelled = asyncio.Event()
+
+        async def slow():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        with pytest.raises(TimeoutError):
+            run_coroutine_sync(slow(), timeout=0.05)
+
+        async def wait_cancelled():
+            await asyncio.wait_for(cancelled.wait(), timeout=1)
+            return True
+
+        assert run_coroutine_sync(wait_cancelled()) is True
+
+    def test_call_from_background_loop_raises(self):
+        """常駐イベントループ上からの呼び出しはデッドロックせずにエラーとなる"""
+
+        async def nothing():
+            return None
+
+        async def nested():
+            with pytest.raises(RuntimeError):
+                run_coroutine_sync(nothing())
+            return True
+
+        assert run_coroutine_sync(nested(), timeout=1) is True
@@ -0,0 +1,36 @@
+"""
+FieldInfoToolの単体テスト
+"""
+
+import pytest
+
+from src.agri_ai.langchain_tools.field_info_tool import FieldInfoTool
+
+
+@pytest.fixture
+def tool(mongo_client, mongo_documents):
+    """fields コレクションをモックに差し替えたツール"""
+    mongo_documents.extend([
+        {"field_name": "ハウスA", "area": 300},
+        {"field_name": "トマトハウス", "area": 500},
+        {"field_name": "第1圃場", "area": 1000},
+    ])
+    return FieldInfoTool(mongodb_client_instance=mongo_client)
+
+
+class TestFieldInfoToolSearch:
+    """圃場名検索のテスト"""
+
+    @pytest.mark.asyncio
+    async def test_returns_all_substring_matches(self, tool):
+        """前方一致する圃場があっても部分一致の圃場を返す"""
+        result = await tool._arun("ハウス")
+        assert "ハウスA" in result
+        assert "トマトハウス" in result
+        assert "第1圃場" not in result
+
+    @pytest.mark.asyncio
+    async def test_escapes_regex_metacharacters(self, tool):
+        """入力中の正規表現記号は文字として扱う"""
+        result = await tool._arun(".*")
+        assert result == "「.*」に一致する圃場は見つかりませんでした。"
@@ -0,0 +1,101 @@
+"""
+MasterDataResolverのキャッシュの単体テスト
+"""
+
+import pytest
+from difflib import SequenceMatcher
+
+from src.agri_ai.dependencies.database import DatabaseConnection
+from src.agri_ai.services.master_data_resolver import MasterDataResolver, _fuzzy_similarity
+
+
+@pytest.fixture
+def fields(mongo_documents):
+    """fields コレクションが返す圃場マスター（テスト中に書き換え可能）"""
+    mongo_documents.append({"_id": "field_001", "field_code": "F001", "name": "トマトハウス"})
+    return mongo_documents
+
+
+@pytest.fixture
+def resolver(mongo_client, fields):
+    """MongoDB クライアントをモックに差し替えたリゾルバー"""
+    return MasterDataResolver(db_connection=DatabaseConnection(mongo_client))
+
+
+class TestResolutionCache:
+    """照合結果キャッシュのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_hit_reuses_result(self, resolver, mongo_collection, clock):
+        """期限内の同じ入力はマスターを再取得せずに同じ結果を返す"""
+        first = await resolver.resolve_field_data("トマトハウス")
+        second = await resolver.resolve_field_data("トマトハウス")
+
+        assert first == second
+        assert first["field_id"] == "field_001"
+        assert mongo_collection.find.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_master_is_refreshed(self, resolver, mongo_collection, fields, clock):
+        """マスターの期限切れ後は、照合結果が期限内でも再取得した内容で照合する"""
+        await resolver.resolve_field_data("F001")
+        clock.now += resolver.cache_timeout * 0.6
+        await resolver.resolve_field_data("トマトハウス")
+
+        # マスターのみ期限切れ（照合結果の保存からは期限の半分程度しか経っていない）
+        fields[0] = {"_id": "field_002", "field_code": "F002", "name": "トマトハウス"}
+        clock.now += resolver.cache_timeout * 0.6
+        result = await resolver.resolve_field_data("トマトハウス")
+
+        assert result["field_id"] == "field_002"
+        assert mongo_collection.find.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_clear_cache_invalidates_results(self, resolver, mongo_collection, fields, clock):
+        """clear_cache() 後は期限内でも再取得する"""
+        await resolver.resolve_field_data("トマトハウス")
+
+        fields[0] = {"_id": "field_003", "field_code": "F003", "name": "トマトハウス"}
+        resolver.clear_cache()
+        result = await resolver.resolve_field_data("トマトハウス")
+
+        assert result["field_id"] == "field_003"
+        assert mongo_collection.find.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self, resolver, clock):
+        """呼び出し側が結果を書き換えてもキャッシュは影響を受けない"""
+        first = await resolver.resolve_field_data("トマトハウス")
+        first["field_id"] = "changed"
+
+        second = await resolver.resolve_field_data("トマトハウス")
+        assert second["field_id"] == "field_001"
+
+
+class TestFuzzySimilarity:
+    """あいまい一致の類似度キャッシュのテスト"""
+
+    @pytest.fixture(autouse=True)
+    def clear_similarity_cache(self):
+        _fuzzy_similarity.cache_clear()
+        yield
+        _fuzzy_similarity.cache_clear()
+
+    def test_matches_sequence_matcher(self):
+        """閾値を超える組み合わせは SequenceMatcher.ratio() と同じ値を返す"""
+        assert _fuzzy_similarity("トマトハウス", "トマトハウス2") == SequenceMatcher(
+            None, "トマトハウス", "トマトハウス2"
+        ).ratio()
+
+    def test_below_threshold_is_zero(self):
+        """閾値を超え得ない組み合わせは 0.0"""
+        assert _fuzzy_similarity("A", "トマトハウス") == 0.0
+
+    def test_repeated_pair_is_cached(self):
+        """同じ組み合わせの2回目以降はキャッシュから返す"""
+        _fuzzy_similarity("A畑", "A畑2")
+        _fuzzy_similarity("A畑", "A畑2")
+
+        info = _fuzzy_similarity.cache_info()
+        assert info.hits == 1
+        assert info.misses == 1
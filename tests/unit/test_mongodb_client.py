@@ -0,0 +1,177 @@
+"""
+MongoDBClientの単体テスト
+"""
+
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from src.agri_ai.core.event_loop import run_coroutine_sync
+from src.agri_ai.database import mongodb_client as mongodb_client_module
+from src.agri_ai.database.mongodb_client import MongoDBClient, get_mongodb_client
+
+
+@pytest.fixture
+def motor_client_class():
+    """AsyncIOMotorClient をモックに差し替える"""
+    motor_client = MagicMock()
+    motor_client.admin.command = AsyncMock(return_value={"ok": 1})
+    with patch.object(mongodb_client_module, "AsyncIOMotorClient", return_value=motor_client) as client_class:
+        yield client_class
+
+
+class TestMongoDBClientEventLoop:
+    """イベントループとの対応付けのテスト"""
+
+    def test_connection_is_bound_to_connecting_loop(self, motor_client_class):
+        """別のイベントループからは未接続として扱われる"""
+        client = MongoDBClient("mongodb://localhost")
+
+        async def connect():
+            await client.connect()
+            return client.is_connected
+
+        assert asyncio.run(connect()) is True
+
+        async def check():
+            return client.is_connected
+
+        assert asyncio.run(check()) is False
+
+    def test_reconnects_on_new_loop(self, motor_client_class):
+        """新しいイベントループでは接続を作り直す"""
+        client = MongoDBClient("mongodb://localhost")
+
+        async def ensure_connected():
+            if not client.is_connected:
+                await client.connect()
+            return client.is_connected
+
+        assert asyncio.run(ensure_connected()) is True
+        assert asyncio.run(ensure_connected()) is True
+        assert motor_client_class.call_count == 2
+
+    def test_background_loop_uses_dedicated_client(self):
+        """常駐イベントループ上では専用クライアントを返す"""
+
+        async def current_client():
+            return get_mongodb_client()
+
+        assert run_coroutine_sync(current_client()) is mongodb_client_module.background_mongodb_client
+        assert asyncio.run(current_client()) is mongodb_client_module.mongodb_client
+
+
+class TestAgriAIBaseToolClient:
+    """ツールが使用するクライアントのテスト"""
+
+    def test_sync_run_uses_background_client(self):
+        """同期実行（常駐イベントループ）では専用クライアントを使う"""
+        from src.agri_ai.langchain_tools.base_tool import AgriAIBaseTool
+
+        class ClientTool(AgriAIBaseTool):
+            name: str = "client_tool"
+            description: str = "使用中のクライアントを返す"
+
+            async def _arun(self, query: str = "", **kwargs):
+                return self._get_mongodb_client()
+
+        tool = ClientTool()
+        assert tool._run() is mongodb_client_module.background_mongodb_client
+        assert asyncio.run(tool._arun()) is mongodb_client_module.mongodb_client
+
+    def test_explicit_client_is_kept(self, mongo_client):
+        """明示的に渡したクライアントは常にそのまま使う"""
+        from src.agri_ai.langchain_tools.field_info_tool import FieldInfoTool
+
+        tool = FieldInfoTool(mongodb_client_instance=mongo_client)
+        assert tool._get_mongodb_client() is mongo_client
+
+
+class TestEnsureIndexes:
+    """インデックス作成とウォームアップのテスト"""
+
+    @pytest.fixture
+    def client(self, mongo_collection):
+        client = MongoDBClient("mongodb://localhost")
+        client.database = {"work_logs": mongo_collection, "fields": mongo_collection}
+        return client
+
+    @pytest.mark.asyncio
+    async def test_warmup_query_uses_work_log_index(self, client, mongo_collection):
+        """ウォームアップの読み取りは user_work_date インデックスを使う"""
+        await client.ensure_indexes()
+
+        cursor = mongo_collection.find.return_value
+        cursor.sort.assert_called_once_with([("user_id", 1), ("work_date", -1)])
+        cursor.hint.assert_called_once_with("user_work_date")
+
+    @pytest.mark.asyncio
+    async def test_field_index_failure_keeps_work_log_indexes(self, client, mongo_collection):
+        """fields のインデックス作成に失敗しても work_logs の準備は済ませる"""
+        mongo_collection.create_indexes.side_effect = [None, RuntimeError("duplicate key")]
+
+        await client.ensure_indexes()
+
+        assert mongo_collection.create_indexes.await_count == 2
+        assert mongo_collection.find.return_value.to_list.await_count == 1
+
+
+class TestHealthCheckCache:
+    """ヘルスチェック結果の再利用のテスト"""
+
+    @pytest.fixture
+    def client(self):
+        client = MongoDBClient("mongodb://localhost")
+        client.client = MagicMock()
+        client.client.admin.command = AsyncMock(
+            side_effect=lambda name: {"ok": 1} if name == "ping" else {"host": "db", "version": "7.0", "uptime": 1}
+        )
+        return client
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_server_status(self, client, clock):
+        """期限内の連続呼び出しは ping のみ行い、serverStatus は問い合わせない"""
+        first = await client.health_check()
+        second = await client.health_check()
+
+        assert first == second
+        assert first["status"] == "healthy"
+        commands = [call.args[0] for call in client.client.admin.command.await_args_list]
+        assert commands == ["ping", "serverStatus", "ping"]
+
+    @pytest.mark.asyncio
+    async def test_ping_failure_within_ttl_is_reported(self, client, clock):
+        """期限内でも ping に失敗すればエラーを返す"""
+        await client.health_check()
+        client.client.admin.command.side_effect = RuntimeError("down")
+
+        assert (await client.health_check())["status"] == "error"
+        assert client._last_health is None
+
+    @pytest.mark.asyncio
+    async def test_expired_result_is_rechecked(self, client, clock):
+        """期限切れ後は再度問い合わせる"""
+        await client.health_check()
+        clock.now += mongodb_client_module.HEALTH_CHECK_TTL
+        await client.health_check()
+
+        assert client.client.admin.command.await_count == 4
+
+    @pytest.mark.asyncio
+    async def test_error_clears_cached_result(self, client, clock):
+        """エラー時は結果を保持せず、次回は再度問い合わせる"""
+        await client.health_check()
+        clock.now += mongodb_client_module.HEALTH_CHECK_TTL
+        client.client.admin.command.side_effect = RuntimeError("down")
+
+        assert (await client.health_check())["status"] == "error"
+        assert client._last_health is None
+
+    @pytest.mark.asyncio
+    async def test_disconnect_clears_cached_result(self, client, clock):
+        """切断すると保持している結果を破棄する"""
+        await client.health_check()
+        await client.disconnect()
+
+        assert client._last_health is None
+        assert (await client.health_check())["status"] == "error"
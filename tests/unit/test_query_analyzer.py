@@ -0,0 +1,68 @@
+"""
+QueryAnalyzerの分析結果キャッシュの単体テスト
+"""
+
+import pytest
+from unittest.mock import AsyncMock
+
+from src.agri_ai.services.query_analyzer import QueryAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    analyzer = QueryAnalyzer()
+    analyzer.analyze_query_intent = AsyncMock(return_value={"intent": "field_info", "extracted_data": {}})
+    analyzer.create_execution_plan = AsyncMock(return_value="📋 実行プラン")
+    return analyzer
+
+
+class TestAnalyzeAndPlanCache:
+    """analyze_and_plan のキャッシュのテスト"""
+
+    @pytest.mark.asyncio
+    async def test_hit_skips_analysis(self, analyzer, clock):
+        """同一メッセージは期限内であれば再分析しない"""
+        first = await analyzer.analyze_and_plan("A畑の状況は？")
+        second = await analyzer.analyze_and_plan("A畑の状況は？")
+
+        assert first == second
+        assert analyzer.analyze_query_intent.await_count == 1
+        assert analyzer.create_execution_plan.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_is_reanalyzed(self, analyzer, clock):
+        """期限切れのエントリは再分析する"""
+        await analyzer.analyze_and_plan("A畑の状況は？")
+        clock.now += analyzer.cache_timeout
+        await analyzer.analyze_and_plan("A畑の状況は？")
+
+        assert analyzer.analyze_query_intent.await_count == 2
+        assert len(analyzer.analysis_cache) == 1
+
+    @pytest.mark.asyncio
+    async def test_error_result_is_not_cached(self, analyzer, clock):
+        """分析に失敗した結果はキャッシュしない"""
+        analyzer.analyze_query_intent.return_value = {"intent": "general", "error": "failed"}
+        await analyzer.analyze_and_plan("A畑の状況は？")
+        await analyzer.analyze_and_plan("A畑の状況は？")
+
+        assert analyzer.analyze_query_intent.await_count == 2
+        assert analyzer.analysis_cache == {}
+
+    @pytest.mark.asyncio
+    async def test_oldest_entry_is_evicted(self, analyzer, clock):
+        """上限を超えると最も古いエントリから破棄する"""
+        analyzer.analysis_cache_maxsize = 2
+        for message in ("A畑", "B畑", "C畑"):
+            await analyzer.analyze_and_plan(message)
+
+        assert list(analyzer.analysis_cache) == ["B畑", "C畑"]
+
+    @pytest.mark.asyncio
+    async def test_cached_result_is_a_copy(self, analyzer, clock):
+        """呼び出し側が結果を書き換えてもキャッシュは影響を受けない"""
+        result, _ = await analyzer.analyze_and_plan("A畑の状況は？")
+        result["intent"] = "changed"
+
+        cached, _ = await analyzer.analyze_and_plan("A畑の状況は？")
+        assert cached["intent"] == "field_info"
@@ -1,7 +1,7 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timedelta
-from src.agri_ai.agents.work_log_search_agent import WorkLogSearchAgent
+from src.agri_ai.agents.work_log_search_agent import WorkLogSearchAgent, _months_ago
 
 @pytest.fixture
 def mock_data_access():
@@ -35,6 +35,21 @@ async def test_parse_search_query_last_month(work_log_search_agent):
     assert params['date_range']['start'].month == (datetime.now().replace(day=1) - timedelta(days=1)).month
     assert '防除' in params['work_categories']
 
+@pytest.mark.asyncio
+async def test_parse_search_query_last_month_boundaries(work_log_search_agent):
+    params = await work_log_search_agent._parse_search_query("先月の作業記録")
+    start, end = params['date_range']['start'], params['date_range']['end']
+    start_of_this_month = datetime.now().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    assert start.day == 1 and (start.hour, start.minute, start.second) == (0, 0, 0)
+    assert end < start_of_this_month
+    assert end + timedelta(microseconds=1) == start_of_this_month
+
+def test_months_ago_is_calendar_correct():
+    assert _months_ago(datetime(2025, 3, 31), 1) == datetime(2025, 2, 28)
+    assert _months_ago(datetime(2024, 3, 31), 1) == datetime(2024, 2, 29)
+    assert _months_ago(datetime(2025, 1, 15, 9, 30), 3) == datetime(2024, 10, 15, 9, 30)
+    assert _months_ago(datetime(2025, 7, 10), 12) == datetime(2024, 7, 10)
+
 @pytest.mark.asyncio
 async def test_parse_search_query_field_and_crop(work_log_search_agent):
     query = "トマトハウスのトマトの収穫記録"
@@ -95,6 +110,26 @@ async def test_format_search_results(work_log_search_agent):
     assert formatted['total_count'] == 1
     assert "日付: 2025-07-24 圃場: トマトハウス 作業内容: トマトを収穫" in formatted['results'][0]['summary']
 
+def test_format_search_results_truncates_to_format_limit(work_log_search_agent):
+    records = [
+        {
+            'log_id': f'log{i}',
+            'work_date': datetime(2025, 7, 1) + timedelta(days=i),
+            'category': '防除',
+            'original_message': '防除作業',
+            'extracted_data': {},
+            'created_at': datetime(2025, 7, 1, 9, 5) + timedelta(days=i),
+        }
+        for i in range(5)
+    ]
+    analyzed = {'total_count': 5, 'results': records, 'statistics': {}, 'patterns': [], 'recommendations': []}
+    formatted = work_log_search_agent._format_search_results(analyzed, {'format_limit': 2})
+    assert formatted['total_count'] == 5
+    assert formatted['truncated'] is True
+    assert [r['log_id'] for r in formatted['results']] == ['log0', 'log1']
+    assert formatted['results'][0]['work_date'] == '2025-07-01'
+    assert formatted['results'][0]['created_at'] == '2025-07-01 09:05'
+
 @pytest.mark.asyncio
 async def test_search_work_logs_integration(work_log_search_agent, mock_data_access):
     mock_data_access.search_work_logs.return_value = [